@@ -1,8 +1,20 @@
 from importlib.metadata import metadata
 
+from . import aggregate
+from . import backfill
+from . import baseline
+from . import cluster
+from . import config
 from . import filesystem
+from . import history
 from . import module
+from . import parallel
 from . import parser
+from . import pragma
+from . import results
+from . import scoring
+from . import store
+from . import watch
 
 m = metadata('cohesion')
 
@@ -12,7 +24,19 @@ __description__ = m['Summary']
 __url__ = m['Home-page']
 __license__ = m['License']
 __all__ = [
+    'aggregate',
+    'backfill',
+    'baseline',
+    'cluster',
+    'config',
     'filesystem',
+    'history',
     'module',
+    'parallel',
     'parser',
+    'pragma',
+    'results',
+    'scoring',
+    'store',
+    'watch',
 ]
@@ -3,10 +3,28 @@
 from __future__ import print_function
 
 import argparse
+import contextlib
 import json
+import logging
+import os
+import subprocess
+import sys
 
+from . import aggregate
+from . import backfill
+from . import baseline
+from . import cluster
+from . import config
 from . import filesystem
+from . import history
 from . import module
+from . import parallel
+from . import parser
+from . import results
+from . import store
+from . import watch
+
+logger = logging.getLogger(__name__)
 
 
 class ModuleStructureEncoder(json.JSONEncoder):
@@ -27,7 +45,7 @@ def leftpad_print(s, leftpad_length=0):
     print(" " * leftpad_length + s)
 
 
-def print_module_structure(filename, module_structure, verbose=False):
+def print_module_structure(filename, module_structure, verbose=False, clusters=False):
     leftpad_print("File: {}".format(filename), leftpad_length=0)
 
     for class_name, class_structure in module_structure.items():
@@ -79,12 +97,130 @@ def print_module_structure(filename, module_structure, verbose=False):
                             leftpad_length=6
                         )
 
+        if clusters:
+            for function_names, variable_names in cluster.get_class_split_clusters(class_structure):
+                cluster_output_string = "Cluster: {} ({})".format(
+                    ", ".join(function_names),
+                    ", ".join(variable_names)
+                )
+                leftpad_print(cluster_output_string, leftpad_length=4)
+
         leftpad_print("Total: {}%".format(class_structure["cohesion"]), leftpad_length=4)
 
 
-def parse_args():
+def print_aggregates(aggregator):
+    leftpad_print("Aggregate:", leftpad_length=0)
+
+    for components, node in aggregator.items():
+        aggregate_output_string = "{}: {} {}% ({} files, {} classes)".format(
+            node.kind(),
+            "/".join(components) or ".",
+            node.cohesion(),
+            node.file_count,
+            node.class_count
+        )
+        leftpad_print(aggregate_output_string, leftpad_length=2 + 2 * len(components))
+
+
+def print_top_classes(top_classes, args):
+    if args.jsonl or args.debug:
+        for filename, class_name, class_structure in top_classes.items():
+            print_results(filename, {class_name: class_structure}, args)
+        return
+
+    leftpad_print("Top: {} by {}".format(top_classes.count, top_classes.sort), leftpad_length=0)
+
+    for filename, class_name, class_structure in top_classes.items():
+        top_output_string = "Class: {} {} ({}:{}) {}% ({} methods, {} attributes)".format(
+            filename,
+            class_name,
+            class_structure["lineno"],
+            class_structure["col_offset"],
+            class_structure["cohesion"],
+            len(class_structure["functions"]),
+            len(class_structure["variables"])
+        )
+        leftpad_print(top_output_string, leftpad_length=2)
+
+
+def print_results(filename, module_structure, args):
+    if args.jsonl:
+        print(results.dump_record(filename, module_structure))
+    elif args.debug:
+        result = json.dumps(
+            module_structure,
+            cls=ModuleStructureEncoder,
+            indent=4,
+            separators=(',', ': ')
+        )
+        print(result)
+    else:
+        print_module_structure(filename, module_structure, args.verbose, args.clusters)
+
+
+def positive_integer(value):
+    error_message = 'invalid value {!r} please specify a positive integer'.format(value)
+    try:
+        int_value = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(error_message)
+
+    if int_value <= 0:
+        raise argparse.ArgumentTypeError(error_message)
+
+    return int_value
+
+
+def non_negative_integer(value):
+    error_message = 'invalid value {!r} please specify a non-negative integer'.format(value)
+    try:
+        int_value = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(error_message)
+
+    if int_value < 0:
+        raise argparse.ArgumentTypeError(error_message)
+
+    return int_value
+
+
+def add_clusters_argument(p):
+    p.add_argument(
+        '-c',
+        '--clusters',
+        action='store_true',
+        help='print groups of methods that share no variables with each\n'
+             'other, i.e. candidates for extracting a class'
+    )
+
+
+def add_aggregate_arguments(p):
+    aggregate_group = p.add_argument_group('aggregates')
+    aggregate_group.add_argument(
+        '--aggregate',
+        action='store',
+        nargs='?',
+        const=aggregate.WEIGHT_CLASSES,
+        choices=aggregate.WEIGHTS,
+        default=None,
+        help='print cohesion rolled up per directory, package and module,\n'
+             'weighting each class equally or by its methods or attributes'
+    )
+    aggregate_group.add_argument(
+        '--depth',
+        action='store',
+        type=non_negative_integer,
+        metavar='N',
+        default=None,
+        help='only roll up paths with at most N components'
+    )
+
+
+def parse_args(argv=None):
     p = argparse.ArgumentParser(description='''
         A tool for measuring Python class cohesion.
+
+        Use "cohesion merge -h" for combining sharded results.
         ''', formatter_class=argparse.RawTextHelpFormatter)
 
     output_group = p.add_mutually_exclusive_group()
@@ -100,6 +236,11 @@ def parse_args():
         action='store_true',
         help='print debugging output'
     )
+    output_group.add_argument(
+        '--jsonl',
+        action='store_true',
+        help='print one JSON line of results per file'
+    )
 
     files_group = p.add_mutually_exclusive_group(required=True)
     files_group.add_argument(
@@ -107,7 +248,15 @@ def parse_args():
         '--files',
         action='store',
         nargs='+',
-        help='analyze these Python files'
+        help='analyze these Python files, "-" reads from standard input'
+    )
+    files_group.add_argument(
+        '--files-from',
+        action='store',
+        metavar='FILE',
+        help='analyze the Python files listed in this file, one per line\n'
+             'or NUL-delimited as by "git ls-files -z", "-" reads the list\n'
+             'from standard input'
     )
     files_group.add_argument(
         '-d',
@@ -115,6 +264,13 @@ def parse_args():
         action='store',
         help='recursively analyze this directory of Python files'
     )
+    files_group.add_argument(
+        '--watch',
+        action='store',
+        metavar='DIR',
+        help='analyze this directory of Python files, then keep running\n'
+             'and reanalyze files as they change'
+    )
 
     def percentage(value):
         error_message = 'invalid percentage {!r} please specify a number between 0 and 100'.format(value)
@@ -146,40 +302,742 @@ def parse_args():
         help='only show results with this percentage or higher'
     )
 
-    args = p.parse_args()
+    p.add_argument(
+        '--nested-scopes',
+        action='store',
+        choices=parser.NESTED_SCOPES_POLICIES,
+        default=parser.NESTED_SCOPES_INCLUDE,
+        help='whether functions, lambdas and classes nested inside of a\n'
+             'method count towards its variable usage (default: %(default)s)'
+    )
+
+    selection_group = p.add_argument_group('selection')
+    selection_group.add_argument(
+        '--class',
+        action='append',
+        dest='class_patterns',
+        metavar='PATTERN',
+        default=None,
+        help='only analyze classes whose qualified name matches this glob,\n'
+             'e.g. "*Handler" or "Outer.*", may be repeated'
+    )
+    selection_group.add_argument(
+        '--module',
+        action='append',
+        dest='module_patterns',
+        metavar='PATTERN',
+        default=None,
+        help='only read files whose dotted module path matches this glob,\n'
+             'e.g. "*.handlers.*", may be repeated'
+    )
+
+    def shard(value):
+        try:
+            return results.parse_shard(value)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    p.add_argument(
+        '--stdin-filename',
+        action='store',
+        metavar='NAME',
+        default=None,
+        help='filename to report for source code read from standard input'
+    )
+    p.add_argument(
+        '--shard',
+        action='store',
+        type=shard,
+        metavar='i/N',
+        default=None,
+        help='only analyze the i-th of N deterministic partitions of the\n'
+             'files, combine the --jsonl output of each with "cohesion merge"'
+    )
+
+    add_clusters_argument(p)
+    add_aggregate_arguments(p)
+
+    ranking_group = p.add_argument_group('ranking')
+    ranking_group.add_argument(
+        '--top',
+        action='store',
+        type=positive_integer,
+        metavar='N',
+        default=None,
+        help='only print the N worst classes across all files, ranked\n'
+             'by --sort'
+    )
+    ranking_group.add_argument(
+        '--sort',
+        action='store',
+        choices=results.SORT_KEYS,
+        default=None,
+        help='rank classes by lowest cohesion, or by most methods or\n'
+             'attributes (default: {})'.format(results.SORT_COHESION)
+    )
+
+    p.add_argument(
+        '-j',
+        '--jobs',
+        action='store',
+        type=positive_integer,
+        metavar='N',
+        default=1,
+        help='analyze files in N worker processes (default: %(default)s)'
+    )
+    p.add_argument(
+        '--unordered',
+        action='store_true',
+        help='with --jobs, print results as files finish rather than in\n'
+             'input order'
+    )
+
+    limits_group = p.add_argument_group('limits')
+    limits_group.add_argument(
+        '--low-memory',
+        action='store_true',
+        help='release syntax trees as soon as each class is summarized'
+    )
+    limits_group.add_argument(
+        '--prefilter',
+        action='store_true',
+        help='skip parsing files in which no line starts with a class\n'
+             'statement, syntax errors in those files go unreported'
+    )
+    limits_group.add_argument(
+        '--max-file-size',
+        action='store',
+        type=positive_integer,
+        metavar='BYTES',
+        default=None,
+        help='skip files larger than this many bytes'
+    )
+    limits_group.add_argument(
+        '--max-classes',
+        action='store',
+        type=positive_integer,
+        metavar='N',
+        default=None,
+        help='skip files defining more than this many classes'
+    )
+
+    p.add_argument(
+        '--binary',
+        action='store',
+        metavar='FILE',
+        default=None,
+        help='write the results of this run to a binary result file, use\n'
+             '"cohesion show FILE" to query it'
+    )
+
+    history_group = p.add_argument_group('history')
+    history_group.add_argument(
+        '--record',
+        action='store',
+        metavar='DB',
+        default=None,
+        help='append the results of this run to a SQLite database, use\n'
+             '"cohesion trend DB" to report regressions over time'
+    )
+    history_group.add_argument(
+        '--commit',
+        action='store',
+        metavar='REVISION',
+        default=None,
+        help='git revision to record results under (default: HEAD)'
+    )
+
+    p.add_argument(
+        '--config',
+        action='store',
+        metavar='FILE',
+        default=None,
+        help='read [tool.cohesion] settings from this pyproject.toml\n'
+             '(default: the nearest pyproject.toml that has them)'
+    )
+
+    p.add_argument(
+        '--baseline',
+        action='store',
+        metavar='FILE',
+        default=None,
+        help='only show classes that are new or whose cohesion dropped\n'
+             'compared to this baseline file (missing files are empty)'
+    )
+    p.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='write the results of this run to the --baseline file'
+    )
+
+    args = p.parse_args(argv)
+
+    args.class_filter = None
+    if args.class_patterns:
+        args.class_filter = config.compile_globs(args.class_patterns).match
+
+    if args.aggregate and args.jsonl:
+        p.error('--aggregate cannot be combined with --jsonl')
+
+    if args.files and args.files.count(filesystem.STDIN_FILENAME) > 1:
+        p.error('standard input can only be analyzed once')
+
+    if args.files and filesystem.STDIN_FILENAME in args.files and args.jobs > 1:
+        p.error('standard input cannot be analyzed with --jobs')
+
+    if args.commit and not args.record:
+        p.error('--commit requires --record')
+
+    if args.update_baseline and not args.baseline:
+        p.error('--update-baseline requires --baseline')
+
+    if args.unordered and args.shard:
+        p.error('--unordered cannot be combined with --shard, shards must be sorted')
+
+    if args.sort and not args.top:
+        p.error('--sort requires --top')
+
+    if args.top and args.sort is None:
+        args.sort = results.SORT_COHESION
+
+    if args.watch:
+        for option, enabled in (
+            ('--aggregate', args.aggregate),
+            ('--binary', args.binary),
+            ('--record', args.record),
+            ('--shard', args.shard),
+            ('--top', args.top),
+            ('--update-baseline', args.update_baseline),
+        ):
+            if enabled:
+                p.error('--watch cannot be combined with {}'.format(option))
 
     return args
 
 
-def main():
-    args = parse_args()
+def load_config(args):
+    """
+    Return the configuration of this run, or None if there is none
+    """
+    try:
+        if args.config:
+            return config.Config.from_file(args.config)
+        return config.Config.find()
+    except (OSError, config.ConfigError) as e:
+        raise SystemExit('cohesion: error: {}'.format(e))
+
+
+def get_display_filename(filename, args):
+    if filesystem.is_stdin(filename) and args.stdin_filename:
+        return args.stdin_filename
+
+    return filename
+
+
+def analyze_files(files, args, skip_invalid=False):
+    """
+    Yield (filename, module) pairs for files, skipping files that exceed the
+    configured limits, and with skip_invalid files that cannot be parsed
+    """
+    options = {
+        'skip_invalid': skip_invalid,
+        'nested_scopes': args.nested_scopes,
+        'low_memory': args.low_memory,
+        'max_classes': args.max_classes,
+        'max_file_size': args.max_file_size,
+        'class_filter': args.class_filter,
+        'prefilter': args.prefilter,
+    }
+
+    if args.jobs > 1:
+        analyzed_files = parallel.analyze_files(files, args.jobs, ordered=not args.unordered, **options)
+    else:
+        analyzed_files = (
+            (filename, parallel.analyze_file(filename, **options))
+            for filename in files
+        )
+
+    for filename, file_module in analyzed_files:
+        if isinstance(file_module, (module.ModuleTooLarge, SyntaxError)):
+            logger.warning("Skipping %s: %s", filename, file_module)
+            continue
+        elif isinstance(file_module, module.ModuleSkipped):
+            logger.info("Skipping %s: %s", filename, file_module)
+            continue
+
+        yield get_display_filename(filename, args), file_module
+
+
+def parse_merge_args(argv):
+    p = argparse.ArgumentParser(prog='cohesion merge', description='''
+        Merge the --jsonl results of several shards into one report.
+        ''', formatter_class=argparse.RawTextHelpFormatter)
+
+    output_group = p.add_mutually_exclusive_group()
+    output_group.add_argument(
+        '-v',
+        '--verbose',
+        action='store_true',
+        help='print more verbose output'
+    )
+    output_group.add_argument(
+        '-x',
+        '--debug',
+        action='store_true',
+        help='print debugging output'
+    )
+    output_group.add_argument(
+        '--jsonl',
+        action='store_true',
+        help='print one JSON line of results per file'
+    )
+
+    add_clusters_argument(p)
+    add_aggregate_arguments(p)
+
+    p.add_argument(
+        'results',
+        nargs='+',
+        metavar='FILE',
+        help='JSON lines result files, each sorted by filename, or\n'
+             'binary result files'
+    )
+
+    args = p.parse_args(argv)
+
+    if args.aggregate and args.jsonl:
+        p.error('--aggregate cannot be combined with --jsonl')
+
+    return args
+
+
+def open_records(filename, stack):
+    """
+    Return the (filename, module_structure) records of a JSON lines or binary
+    result file, which is closed with stack
+    """
+    if store.is_store_file(filename):
+        return stack.enter_context(store.Store.from_file(filename)).iter_records()
+
+    return results.iter_records(stack.enter_context(open(filename)))
+
+
+def merge_main(argv):
+    args = parse_merge_args(argv)
+
+    summary = results.Summary()
+    aggregator = None
+    if args.aggregate:
+        aggregator = aggregate.TreeAggregator(args.aggregate, args.depth)
+
+    with contextlib.ExitStack() as stack:
+        try:
+            merged = results.merge_records(
+                open_records(filename, stack)
+                for filename in args.results
+            )
+            for filename, module_structure in merged:
+                summary.add(filename, module_structure)
+                if aggregator is not None:
+                    aggregator.add(filename, module_structure)
+                print_results(filename, module_structure, args)
+        except (OSError, ValueError) as e:
+            raise SystemExit('cohesion: error: {}'.format(e))
+
+    if aggregator is not None:
+        print_aggregates(aggregator)
+
+    if not args.jsonl:
+        print(summary)
+
+
+def parse_show_args(argv):
+    p = argparse.ArgumentParser(prog='cohesion show', description='''
+        Print results from a binary result file written by --binary.
+        ''', formatter_class=argparse.RawTextHelpFormatter)
+
+    output_group = p.add_mutually_exclusive_group()
+    output_group.add_argument(
+        '-v',
+        '--verbose',
+        action='store_true',
+        help='print more verbose output'
+    )
+    output_group.add_argument(
+        '-x',
+        '--debug',
+        action='store_true',
+        help='print debugging output'
+    )
+    output_group.add_argument(
+        '--jsonl',
+        action='store_true',
+        help='print one JSON line of results per file'
+    )
+
+    add_clusters_argument(p)
+
+    p.add_argument(
+        '--class',
+        action='store',
+        dest='class_name',
+        metavar='NAME',
+        default=None,
+        help='only print classes with this qualified name'
+    )
+    p.add_argument(
+        '--file',
+        action='store',
+        dest='filename',
+        metavar='FILE',
+        default=None,
+        help='only print classes in this file'
+    )
+    p.add_argument(
+        'results',
+        metavar='FILE',
+        help='binary result file'
+    )
+
+    return p.parse_args(argv)
+
+
+def show_main(argv):
+    args = parse_show_args(argv)
+
+    try:
+        result_store = store.Store.from_file(args.results)
+    except (OSError, ValueError) as e:
+        raise SystemExit('cohesion: error: {}: {}'.format(args.results, e))
+
+    with result_store:
+        if args.filename is not None:
+            module_structure = result_store.find_file(args.filename)
+            if module_structure is None:
+                raise SystemExit('cohesion: error: {} is not in {}'.format(args.filename, args.results))
+            if args.class_name is not None:
+                module_structure = {
+                    class_name: class_structure
+                    for class_name, class_structure in module_structure.items()
+                    if class_name == args.class_name
+                }
+            print_results(args.filename, module_structure, args)
+        elif args.class_name is not None:
+            for filename, class_structure in result_store.find_class(args.class_name):
+                print_results(filename, {args.class_name: class_structure}, args)
+        else:
+            for filename, module_structure in result_store.iter_records():
+                print_results(filename, module_structure, args)
+
+
+def parse_trend_args(argv):
+    p = argparse.ArgumentParser(prog='cohesion trend', description='''
+        Report classes whose cohesion dropped between recorded runs.
+        ''', formatter_class=argparse.RawTextHelpFormatter)
+
+    p.add_argument(
+        '--runs',
+        action='store',
+        type=positive_integer,
+        metavar='N',
+        default=2,
+        help='compare each pair of consecutive runs among the last N runs\n'
+             '(default: %(default)s)'
+    )
+    p.add_argument(
+        'database',
+        metavar='DB',
+        help='SQLite database written by --record'
+    )
+
+    return p.parse_args(argv)
+
+
+def trend_main(argv):
+    args = parse_trend_args(argv)
+
+    if not os.path.isfile(args.database):
+        raise SystemExit('cohesion: error: {} does not exist'.format(args.database))
+
+    with history.History(args.database) as run_history:
+        for previous_run, current_run, regressions in run_history.trend(args.runs):
+            leftpad_print("Runs: {} -> {}".format(previous_run[1], current_run[1]), leftpad_length=0)
+
+            for filename, class_name, previous_cohesion, current_cohesion in regressions:
+                regression_output_string = "Class: {} {} {}% -> {}%".format(
+                    filename,
+                    class_name,
+                    previous_cohesion,
+                    current_cohesion
+                )
+                leftpad_print(regression_output_string, leftpad_length=2)
+
+
+def parse_backfill_args(argv):
+    p = argparse.ArgumentParser(prog='cohesion backfill', description='''
+        Record the cohesion of past commits read directly from git.
+        ''', formatter_class=argparse.RawTextHelpFormatter)
+
+    p.add_argument(
+        '--record',
+        action='store',
+        metavar='DB',
+        required=True,
+        help='SQLite database to append results to'
+    )
+    p.add_argument(
+        '-n',
+        '--commits',
+        action='store',
+        type=positive_integer,
+        metavar='N',
+        default=None,
+        help='only backfill the last N commits'
+    )
+    p.add_argument(
+        '-C',
+        '--repository',
+        action='store',
+        metavar='DIR',
+        default=None,
+        help='git repository to read from (default: current directory)'
+    )
+    p.add_argument(
+        '--nested-scopes',
+        action='store',
+        choices=parser.NESTED_SCOPES_POLICIES,
+        default=parser.NESTED_SCOPES_INCLUDE,
+        help='whether functions, lambdas and classes nested inside of a\n'
+             'method count towards its variable usage (default: %(default)s)'
+    )
+    p.add_argument(
+        'revision',
+        nargs='?',
+        default='HEAD',
+        help='revision to walk back from (default: %(default)s)'
+    )
+
+    return p.parse_args(argv)
+
+
+def backfill_main(argv):
+    args = parse_backfill_args(argv)
+
+    with history.History(args.record) as run_history:
+        commits = backfill.backfill(
+            run_history,
+            args.revision,
+            args.commits,
+            args.repository,
+            nested_scopes=args.nested_scopes
+        )
+        try:
+            for commit_hash, file_count, analyzed_count in commits:
+                leftpad_print(
+                    "Commit: {} ({} files, {} analyzed)".format(commit_hash, file_count, analyzed_count),
+                    leftpad_length=0
+                )
+        except (OSError, subprocess.CalledProcessError):
+            raise SystemExit('cohesion: error: unable to read the commits of {}'.format(args.revision))
+
+
+SUBCOMMANDS = {
+    'merge': merge_main,
+    'show': show_main,
+    'trend': trend_main,
+    'backfill': backfill_main,
+}
+
+
+def begin_recording(args):
+    """
+    Return a (history, run id) pair for recording the results of this run
+    """
+    revision = args.commit or 'HEAD'
+
+    try:
+        commit_hash, timestamp = history.get_commit(revision)
+    except (OSError, subprocess.CalledProcessError):
+        if args.commit is None:
+            raise SystemExit('cohesion: error: unable to determine the git commit, specify --commit')
+        commit_hash, timestamp = args.commit, None
+
+    run_history = history.History(args.record)
+
+    return run_history, run_history.begin_run(commit_hash, timestamp)
+
+
+def select_files(files, args, run_config):
+    """
+    Return the files that are not excluded by --module or the configuration
+    """
+    if args.module_patterns:
+        module_pattern = config.compile_globs(args.module_patterns)
+        files = (
+            filename
+            for filename in files
+            if module_pattern.match(filesystem.get_module_name(get_display_filename(filename, args)))
+        )
+
+    if run_config is not None:
+        files = (
+            filename
+            for filename in files
+            if not run_config.is_excluded(get_display_filename(filename, args))
+        )
+
+    return files
+
+
+def apply_config(filename, file_module, args, run_config):
+    """
+    Drop ignored classes from a module and return the (below, above)
+    thresholds for its file
+    """
+    below, above = args.below, args.above
+
+    if run_config is not None:
+        settings = run_config.settings(filename)
+        file_module.filter_ignored(settings.is_class_ignored)
+        # Thresholds given on the command line apply to every file
+        if below is None and above is None:
+            below, above = settings.below, settings.above
+
+    return below, above
+
+
+def filter_results(filename, file_module, previous_baseline, below, above):
+    if previous_baseline is not None:
+        file_module.filter_baseline(previous_baseline, filename)
+
+    if below:
+        file_module.filter_below(below)
+    elif above:
+        file_module.filter_above(above)
+
+
+def watch_directory(watcher, args, run_config, previous_baseline):
+    """
+    Reanalyze and print the results of Python files as they change, until
+    interrupted. Each burst of changes is analyzed together, and files that
+    are mid-edit and cannot be parsed are skipped
+    """
+    try:
+        for changed_files in watch.iter_changes(watcher):
+            existing_files = sorted(
+                filename
+                for filename in changed_files
+                if os.path.isfile(filename)
+            )
+            selected_files = select_files(existing_files, args, run_config)
+
+            for filename, file_module in analyze_files(selected_files, args, skip_invalid=True):
+                below, above = apply_config(filename, file_module, args, run_config)
+                filter_results(filename, file_module, previous_baseline, below, above)
+                print_results(filename, file_module.structure, args)
+
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if argv and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
+
+    args = parse_args(argv)
+
+    logging.basicConfig(format='%(levelname)s: %(message)s')
+
+    # The watcher is started before the initial scan, so that files saved
+    # during it are reanalyzed afterwards
+    watcher = None
+    if args.watch:
+        watcher = watch.get_watcher(args.watch)
 
     if args.files:
         files = args.files
+    elif args.files_from:
+        files = filesystem.get_python_files_from_list(args.files_from)
     elif args.directory:
-        files = filesystem.recursively_get_python_files_from_directory(args.directory)
+        files = sorted(filesystem.recursively_get_python_files_from_directory(args.directory))
+    elif args.watch:
+        files = sorted(filesystem.recursively_get_python_files_from_directory(args.watch))
 
-    file_modules = {
-        filename: module.Module.from_file(filename)
-        for filename in files
-    }
+    if args.shard is not None:
+        files = results.filter_shard(files, *args.shard)
 
-    for filename, file_module in file_modules.items():
-        if args.below:
-            file_module.filter_below(args.below)
-        elif args.above:
-            file_module.filter_above(args.above)
-
-        if args.debug:
-            result = json.dumps(
-                file_module.structure,
-                cls=ModuleStructureEncoder,
-                indent=4,
-                separators=(',', ': ')
-            )
-            print(result)
+    run_config = load_config(args)
+    files = select_files(files, args, run_config)
+
+    if args.update_baseline:
+        run_baseline = baseline.Baseline()
+        for filename, file_module in analyze_files(files, args):
+            if run_config is not None:
+                file_module.filter_ignored(run_config.settings(filename).is_class_ignored)
+            run_baseline.add_module(filename, file_module)
+        run_baseline.to_file(args.baseline)
+        return
+
+    previous_baseline = None
+    if args.baseline:
+        previous_baseline = baseline.Baseline.from_file(args.baseline)
+
+    aggregator = None
+    if args.aggregate:
+        aggregator = aggregate.TreeAggregator(args.aggregate, args.depth)
+
+    run_history = None
+    if args.record:
+        run_history, run_id = begin_recording(args)
+
+    store_writer = None
+    if args.binary:
+        store_writer = store.StoreWriter()
+
+    top_classes = None
+    if args.top:
+        top_classes = results.TopClasses(args.top, args.sort)
+
+    for filename, file_module in analyze_files(files, args):
+        below, above = apply_config(filename, file_module, args, run_config)
+
+        if aggregator is not None:
+            aggregator.add(filename, file_module.structure)
+
+        if run_history is not None:
+            run_history.add_module(run_id, filename, file_module.structure)
+
+        if store_writer is not None:
+            store_writer.add_module(filename, file_module)
+
+        filter_results(filename, file_module, previous_baseline, below, above)
+
+        if top_classes is not None:
+            top_classes.add(filename, file_module.structure)
         else:
-            print_module_structure(filename, file_module.structure, args.verbose)
+            print_results(filename, file_module.structure, args)
+
+    if run_history is not None:
+        run_history.commit()
+        run_history.close()
+
+    if store_writer is not None:
+        store_writer.to_file(args.binary)
+
+    if top_classes is not None:
+        print_top_classes(top_classes, args)
+
+    if aggregator is not None:
+        print_aggregates(aggregator)
+
+    if watcher is not None:
+        watch_directory(watcher, args, run_config, previous_baseline)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+
+from __future__ import division
+
+from . import baseline
+
+WEIGHT_CLASSES = "classes"
+WEIGHT_METHODS = "methods"
+WEIGHT_ATTRIBUTES = "attributes"
+WEIGHTS = (WEIGHT_CLASSES, WEIGHT_METHODS, WEIGHT_ATTRIBUTES)
+
+PACKAGE_INIT_FILENAME = "__init__.py"
+
+
+def class_weight(class_structure, weight=WEIGHT_CLASSES):
+    """
+    Return how much a class counts towards an aggregate cohesion value
+    """
+    if weight == WEIGHT_METHODS:
+        return len(class_structure["functions"])
+    elif weight == WEIGHT_ATTRIBUTES:
+        return len(class_structure["variables"])
+
+    return 1
+
+
+def get_path_components(filename):
+    """
+    Return the non-empty components of a normalized filename
+    """
+    return tuple(
+        component
+        for component in baseline.normalize_filename(filename).split("/")
+        if component and component != "."
+    )
+
+
+class AggregateNode(object):
+    def __init__(self):
+        self.weighted_cohesion = 0.0
+        self.weight = 0
+        self.class_count = 0
+        self.file_count = 0
+        self.is_module = False
+        self.is_package = False
+
+    def add(self, cohesion, weight):
+        self.weighted_cohesion += cohesion * weight
+        self.weight += weight
+        self.class_count += 1
+
+    def cohesion(self):
+        if not self.weight:
+            return 0.0
+
+        return round(self.weighted_cohesion / self.weight, 2)
+
+    def kind(self):
+        if self.is_module:
+            return "Module"
+        elif self.is_package:
+            return "Package"
+
+        return "Directory"
+
+
+class TreeAggregator(object):
+    """
+    Incrementally roll up class cohesion into every directory, package and
+    module containing it. Only the running totals of each path are kept, so
+    results can be streamed through without being retained
+    """
+
+    def __init__(self, weight=WEIGHT_CLASSES, depth=None):
+        if depth is not None and depth < 0:
+            raise ValueError("depth must be non-negative")
+
+        self.weight = weight
+        self.depth = depth
+        self.nodes = {}
+
+    def _get_node(self, components):
+        node = self.nodes.get(components)
+        if node is None:
+            node = self.nodes[components] = AggregateNode()
+        return node
+
+    def add(self, filename, module_structure):
+        components = get_path_components(filename)
+
+        prefixes = [
+            components[:length]
+            for length in range(len(components) + 1)
+            if self.depth is None or length <= self.depth
+        ]
+        nodes = [self._get_node(prefix) for prefix in prefixes]
+
+        if len(prefixes[-1]) == len(components):
+            nodes[-1].is_module = True
+
+        if components and components[-1] == PACKAGE_INIT_FILENAME:
+            parent = components[:-1]
+            if self.depth is None or len(parent) <= self.depth:
+                self._get_node(parent).is_package = True
+
+        for node in nodes:
+            node.file_count += 1
+
+        for class_structure in module_structure.values():
+            cohesion = class_structure["cohesion"] or 0.0
+            weight = class_weight(class_structure, self.weight)
+            for node in nodes:
+                node.add(cohesion, weight)
+
+    def items(self):
+        """
+        Return (path components, node) pairs sorted by path
+        """
+        return sorted(self.nodes.items(), key=lambda item: item[0])
@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+import logging
+import subprocess
+
+from . import filesystem
+from . import history
+from . import module
+
+logger = logging.getLogger(__name__)
+
+
+class BlobReader(object):
+    """
+    Read git objects through a single long running "git cat-file --batch"
+    process instead of checking out each commit
+    """
+
+    def __init__(self, directory=None):
+        self.process = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=directory,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE
+        )
+
+    def read(self, object_hash):
+        self.process.stdin.write(object_hash.encode("ascii") + b"\n")
+        self.process.stdin.flush()
+
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            raise KeyError(object_hash)
+
+        contents = self.process.stdout.read(int(header[2]))
+        # Each object is followed by a newline
+        self.process.stdout.read(1)
+
+        return contents
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def get_commits(revision="HEAD", commit_count=None, directory=None):
+    """
+    Return (hash, timestamp) pairs of the last commit_count commits reachable
+    from a revision, oldest first
+    """
+    arguments = ["log", "--reverse", "--format=%H %ct"]
+    if commit_count is not None:
+        arguments.append("--max-count={}".format(commit_count))
+    arguments.append(revision)
+
+    return [
+        (commit_hash, int(timestamp))
+        for commit_hash, timestamp in (
+            line.split()
+            for line in history.run_git(arguments, directory).splitlines()
+        )
+    ]
+
+
+def parse_tree_entries(output):
+    """
+    Return (path, blob hash) pairs of Python files in "git ls-tree -r -z"
+    output
+    """
+    entries = []
+
+    for entry in output.split("\0"):
+        if not entry:
+            continue
+        metadata, path = entry.split("\t", 1)
+        _, object_type, object_hash = metadata.split()
+        if object_type == "blob" and filesystem.is_python_file(path):
+            entries.append((path, object_hash))
+
+    return entries
+
+
+def get_tree_python_blobs(commit_hash, directory=None):
+    """
+    Return (path, blob hash) pairs of Python files in a commit
+    """
+    return parse_tree_entries(
+        history.run_git(["ls-tree", "-r", "-z", "--full-tree", commit_hash], directory)
+    )
+
+
+def analyze_blob(reader, path, blob_hash, **kwargs):
+    """
+    Return the structure of a Python blob, or None if it cannot be read or
+    analyzed, e.g. because it is missing from a shallow or partial clone
+    """
+    try:
+        contents = reader.read(blob_hash)
+    except KeyError:
+        logger.info("Skipping %s (%s): object is missing", path, blob_hash)
+        return None
+
+    try:
+        return module.Module.from_string(contents, **kwargs).structure
+    except (SyntaxError, ValueError, module.ModuleTooLarge, module.ModuleSkipped) as e:
+        logger.info("Skipping %s (%s): %s", path, blob_hash, e)
+        return None
+
+
+def backfill(run_history, revision="HEAD", commit_count=None, directory=None, **kwargs):
+    """
+    Record the cohesion of the last commit_count commits reachable from a
+    revision, oldest first, so that runs are recorded in the order trend
+    compares them even when commits share a timestamp. A blob that is unchanged from the previously
+    processed commit is not analyzed again, so it costs a dictionary lookup.
+    Commits that are already recorded are skipped. Yield a (commit hash,
+    file count, analyzed blob count) tuple for each recorded commit
+    """
+    # Only blobs of the previously processed commit are kept, which bounds
+    # the cache to a single tree
+    blob_structures = {}
+
+    commits = get_commits(revision, commit_count, directory)
+
+    with BlobReader(directory) as reader:
+        for commit_hash, timestamp in commits:
+            if run_history.has_commit(commit_hash):
+                continue
+
+            run_id = run_history.begin_run(commit_hash, timestamp)
+            commit_structures = {}
+            analyzed_count = 0
+            tree_blobs = get_tree_python_blobs(commit_hash, directory)
+
+            for path, blob_hash in tree_blobs:
+                if blob_hash in commit_structures:
+                    structure = commit_structures[blob_hash]
+                elif blob_hash in blob_structures:
+                    structure = blob_structures[blob_hash]
+                else:
+                    structure = analyze_blob(reader, path, blob_hash, **kwargs)
+                    analyzed_count += 1
+
+                commit_structures[blob_hash] = structure
+
+                if structure is not None:
+                    run_history.add_module(run_id, path, structure)
+
+            run_history.commit()
+            blob_structures = commit_structures
+
+            yield commit_hash, len(tree_blobs), analyzed_count
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+
+import collections
+import hashlib
+import json
+import os
+
+BASELINE_VERSION = 1
+FINGERPRINT_LENGTH = 16
+
+
+def normalize_filename(filename):
+    """
+    Return a platform independent representation of a filename
+    """
+    return os.path.normpath(filename).replace(os.sep, "/")
+
+
+def class_fingerprint(class_structure):
+    """
+    Return a structural hash of a class that does not depend on its name or
+    location in a file
+    """
+    hasher = hashlib.sha1()
+
+    for function_name in sorted(class_structure["functions"]):
+        hasher.update(function_name.encode("utf-8"))
+        hasher.update(b"\0")
+
+    hasher.update(b"\1")
+
+    for variable_name in sorted(class_structure["variables"]):
+        hasher.update(variable_name.encode("utf-8"))
+        hasher.update(b"\0")
+
+    return hasher.hexdigest()[:FINGERPRINT_LENGTH]
+
+
+def is_new_or_regressed(class_structure, baseline_cohesion):
+    """
+    Return whether a class is new or its cohesion dropped below its baseline
+    cohesion
+    """
+    if baseline_cohesion is None:
+        return True
+
+    return class_structure["cohesion"] < baseline_cohesion
+
+
+class Baseline(object):
+    def __init__(self, entries=()):
+        self.by_name = {}
+        self.by_fingerprint = collections.defaultdict(list)
+
+        for filename, class_name, fingerprint, cohesion in entries:
+            self._add_entry(filename, class_name, fingerprint, cohesion)
+
+    def __len__(self):
+        return len(self.by_name)
+
+    def _add_entry(self, filename, class_name, fingerprint, cohesion):
+        self.by_name[(filename, class_name)] = (fingerprint, cohesion)
+        self.by_fingerprint[(filename, fingerprint)].append(class_name)
+
+    def add(self, filename, class_name, class_structure):
+        self._add_entry(
+            normalize_filename(filename),
+            class_name,
+            class_fingerprint(class_structure),
+            class_structure["cohesion"]
+        )
+
+    def add_module(self, filename, file_module):
+        for class_name in file_module.classes():
+            file_module.class_cohesion_percentage(class_name)
+            self.add(filename, class_name, file_module.structure[class_name])
+
+    def lookup_module(self, filename, module_structure):
+        """
+        Return a dict mapping each class of a file to its baseline cohesion,
+        or None if the class is new. Classes are matched by qualified name
+        first. The rest fall back to their structural fingerprint, matching
+        each baseline class of the same file that no longer exists at most
+        once, so renamed classes are still found but copies are reported
+        """
+        filename = normalize_filename(filename)
+        result = {}
+        unmatched = []
+
+        for class_name, class_structure in module_structure.items():
+            entry = self.by_name.get((filename, class_name))
+            if entry is not None:
+                result[class_name] = entry[1]
+            else:
+                result[class_name] = None
+                unmatched.append(class_name)
+
+        matched = set(module_structure)
+
+        for class_name in unmatched:
+            fingerprint = class_fingerprint(module_structure[class_name])
+            for baseline_class_name in self.by_fingerprint.get((filename, fingerprint), ()):
+                if baseline_class_name not in matched:
+                    matched.add(baseline_class_name)
+                    result[class_name] = self.by_name[(filename, baseline_class_name)][1]
+                    break
+
+        return result
+
+    def entries(self):
+        return [
+            [filename, class_name, fingerprint, cohesion]
+            for (filename, class_name), (fingerprint, cohesion)
+            in sorted(self.by_name.items())
+        ]
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Return the baseline stored in a file, or an empty baseline if the file
+        does not exist yet
+        """
+        if not os.path.exists(filename):
+            return cls()
+
+        with open(filename) as fd:
+            contents = json.load(fd)
+
+        if contents.get("version") != BASELINE_VERSION:
+            raise ValueError("unsupported baseline version in {!r}".format(filename))
+
+        return cls(contents["classes"])
+
+    def to_file(self, filename):
+        contents = {
+            "version": BASELINE_VERSION,
+            "classes": self.entries(),
+        }
+
+        with open(filename, "w") as fd:
+            json.dump(contents, fd, separators=(',', ':'))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+
+FUNCTION_NODE = 0
+VARIABLE_NODE = 1
+
+# Constructors usually touch every variable, which would connect every
+# cluster, so they are left out of the graph
+CONSTRUCTOR_NAMES = frozenset([
+    "__init__",
+    "__new__",
+    "__post_init__",
+])
+
+
+class UnionFind(object):
+    """
+    Disjoint sets with union by size and path halving
+    """
+
+    def __init__(self):
+        self.parents = {}
+        self.sizes = {}
+
+    def add(self, item):
+        if item not in self.parents:
+            self.parents[item] = item
+            self.sizes[item] = 1
+
+    def find(self, item):
+        parents = self.parents
+        while parents[item] != item:
+            parents[item] = parents[parents[item]]
+            item = parents[item]
+        return item
+
+    def union(self, item1, item2):
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+        if root1 == root2:
+            return root1
+
+        if self.sizes[root1] < self.sizes[root2]:
+            root1, root2 = root2, root1
+
+        self.parents[root2] = root1
+        self.sizes[root1] += self.sizes[root2]
+        return root1
+
+    def groups(self):
+        result = {}
+        for item in self.parents:
+            result.setdefault(self.find(item), []).append(item)
+        return list(result.values())
+
+
+def get_class_clusters(class_structure, ignored_functions=CONSTRUCTOR_NAMES):
+    """
+    Return the connected components of the bipartite graph between a class's
+    methods and the class variables they use, as (function names, variable
+    names) pairs with the largest clusters first. Staticmethods and methods
+    using no variables, e.g. __repr__ helpers, belong with any cluster, so
+    they are left out of the graph
+    """
+    components = UnionFind()
+
+    for variable_name in class_structure["variables"]:
+        components.add((VARIABLE_NODE, variable_name))
+
+    for function_name, function_structure in class_structure["functions"].items():
+        if function_name in ignored_functions:
+            continue
+
+        if function_structure["staticmethod"] or not function_structure["variables"]:
+            continue
+
+        function_node = (FUNCTION_NODE, function_name)
+        components.add(function_node)
+        for variable_name in function_structure["variables"]:
+            variable_node = (VARIABLE_NODE, variable_name)
+            components.add(variable_node)
+            components.union(function_node, variable_node)
+
+    clusters = [
+        (
+            sorted(name for kind, name in group if kind == FUNCTION_NODE),
+            sorted(name for kind, name in group if kind == VARIABLE_NODE),
+        )
+        for group in components.groups()
+    ]
+    clusters.sort(key=lambda pair: (-len(pair[0]), -len(pair[1]), pair))
+
+    return clusters
+
+
+def get_class_split_clusters(class_structure, ignored_functions=CONSTRUCTOR_NAMES):
+    """
+    Return the clusters of a class that have both methods and variables if
+    there are at least two of them, i.e. the parts the class could be split
+    into, or an empty list
+    """
+    clusters = [
+        (function_names, variable_names)
+        for function_names, variable_names in get_class_clusters(class_structure, ignored_functions)
+        if function_names and variable_names
+    ]
+
+    return clusters if len(clusters) > 1 else []
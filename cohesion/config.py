@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+
+import fnmatch
+import os
+import re
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+CONFIG_FILENAME = "pyproject.toml"
+CONFIG_SECTION = "tool.cohesion"
+
+THRESHOLD_OPTIONS = ("below", "above")
+OPTION_NAMES = {
+    "below": "below",
+    "above": "above",
+    "exclude": "exclude",
+    "ignore-classes": "ignore_classes",
+}
+
+DEFAULT_OPTIONS = {
+    "below": None,
+    "above": None,
+    "exclude": False,
+    "ignore_classes": (),
+}
+
+
+class ConfigError(Exception):
+    pass
+
+
+def compile_globs(patterns):
+    """
+    Return a regular expression matching any of the glob patterns, or None if
+    there are no patterns
+    """
+    if not patterns:
+        return None
+
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns))
+
+
+def is_string_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def parse_options(table, context):
+    """
+    Return the settings in a configuration table keyed by their Python names
+    """
+    options = {}
+
+    for key, value in table.items():
+        if key not in OPTION_NAMES:
+            raise ConfigError("{}: unknown option {!r}".format(context, key))
+
+        if key in THRESHOLD_OPTIONS:
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 100:
+                raise ConfigError("{}: {!r} must be a number between 0 and 100".format(context, key))
+            value = float(value)
+        elif key == "exclude":
+            if not isinstance(value, bool):
+                raise ConfigError("{}: 'exclude' must be a boolean".format(context))
+        elif not is_string_list(value):
+            raise ConfigError("{}: {!r} must be a list of strings".format(context, key))
+
+        options[OPTION_NAMES[key]] = value
+
+    if all(name in options for name in THRESHOLD_OPTIONS):
+        raise ConfigError("{}: 'below' and 'above' are mutually exclusive".format(context))
+
+    return options
+
+
+class Settings(object):
+    """
+    The resolved settings of a path
+    """
+
+    def __init__(self, below=None, above=None, exclude=False, ignore_classes=()):
+        self.below = below
+        self.above = above
+        self.exclude = exclude
+        self.ignore_classes = compile_globs(ignore_classes)
+
+    def is_class_ignored(self, class_name):
+        return self.ignore_classes is not None and self.ignore_classes.match(class_name) is not None
+
+
+class Config(object):
+    """
+    Settings read from a [tool.cohesion] table, where paths are matched
+    relative to root against the globs of each [[tool.cohesion.overrides]]
+    table. Later overrides take precedence
+    """
+
+    def __init__(self, root, options=None, overrides=()):
+        self.root = os.path.abspath(root)
+        self.options = dict(DEFAULT_OPTIONS, **(options or {}))
+        self.overrides = [
+            (compile_globs(paths), override_options)
+            for paths, override_options in overrides
+        ]
+        # Most paths match no override, which a single combined expression
+        # answers without trying each override in turn
+        self.any_override = compile_globs([
+            path
+            for paths, _ in overrides
+            for path in paths
+        ])
+        self.resolved = {}
+
+    @classmethod
+    def from_dict(cls, table, root):
+        table = dict(table)
+        exclude = table.pop("exclude", [])
+        if not is_string_list(exclude):
+            raise ConfigError("[tool.cohesion]: 'exclude' must be a list of strings")
+
+        overrides = []
+        if exclude:
+            overrides.append((exclude, {"exclude": True}))
+
+        override_tables = table.pop("overrides", [])
+        if not isinstance(override_tables, list):
+            raise ConfigError("[tool.cohesion]: 'overrides' must be an array of tables")
+
+        for override_table in override_tables:
+            override_table = dict(override_table)
+            paths = override_table.pop("paths", None)
+            if not paths or not is_string_list(paths):
+                raise ConfigError("[[tool.cohesion.overrides]]: 'paths' must be a non-empty list of strings")
+
+            overrides.append((paths, parse_options(override_table, "[[tool.cohesion.overrides]]")))
+
+        return cls(root, parse_options(table, "[tool.cohesion]"), overrides)
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Return the configuration in a pyproject.toml file, or None if it has
+        no [tool.cohesion] table
+        """
+        with open(filename, "rb") as fd:
+            contents = fd.read()
+
+        # Avoid parsing project files that cannot configure us
+        if CONFIG_SECTION.encode("ascii") not in contents:
+            return None
+
+        if tomllib is None:
+            raise ConfigError("reading {} requires Python 3.11 or tomli".format(filename))
+
+        try:
+            document = tomllib.loads(contents.decode("utf-8"))
+        except (tomllib.TOMLDecodeError, UnicodeDecodeError) as e:
+            raise ConfigError("{}: {}".format(filename, e))
+
+        table = document.get("tool", {}).get("cohesion")
+        if table is None:
+            return None
+
+        return cls.from_dict(table, os.path.dirname(os.path.abspath(filename)))
+
+    @classmethod
+    def find(cls, directory="."):
+        """
+        Return the configuration of the nearest pyproject.toml with a
+        [tool.cohesion] table in directory or its parents, or None
+        """
+        directory = os.path.abspath(directory)
+
+        while True:
+            filename = os.path.join(directory, CONFIG_FILENAME)
+            if os.path.isfile(filename):
+                result = cls.from_file(filename)
+                if result is not None:
+                    return result
+
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                return None
+            directory = parent
+
+    def get_relative_path(self, filename):
+        return os.path.relpath(os.path.abspath(filename), self.root).replace(os.sep, "/")
+
+    def settings(self, filename):
+        """
+        Return the Settings of a path. Settings are shared between paths
+        matching the same overrides
+        """
+        path = self.get_relative_path(filename)
+
+        matched = ()
+        if self.any_override is not None and self.any_override.match(path):
+            matched = tuple(
+                index
+                for index, (pattern, _) in enumerate(self.overrides)
+                if pattern.match(path)
+            )
+
+        result = self.resolved.get(matched)
+        if result is None:
+            result = self.resolved[matched] = self._resolve(matched)
+
+        return result
+
+    def _resolve(self, matched):
+        options = dict(self.options)
+
+        for index in matched:
+            override_options = self.overrides[index][1]
+            # A threshold in an override replaces either inherited threshold
+            if any(name in override_options for name in THRESHOLD_OPTIONS):
+                options.update(dict.fromkeys(THRESHOLD_OPTIONS))
+            options.update(override_options)
+
+        return Settings(**options)
+
+    def is_excluded(self, filename):
+        return self.settings(filename).exclude
@@ -1,16 +1,66 @@
 #!/usr/bin/env python
 
 import os
+import sys
+
+STDIN_FILENAME = "-"
+PATH_LIST_CHUNK_SIZE = 64 * 1024
+
+
+def is_stdin(filename):
+    """
+    Return whether a filename refers to standard input
+    """
+    return filename == STDIN_FILENAME
+
+
+def get_module_name(filename):
+    """
+    Return the dotted module path of a Python filename, e.g. "pkg.module" for
+    "pkg/module.py" or "pkg" for "pkg/__init__.py"
+    """
+    path = os.path.normpath(os.path.splitext(filename)[0]).replace(os.sep, "/")
+    components = [
+        component
+        for component in path.split("/")
+        if component and component not in (".", "..")
+    ]
+
+    if components and components[-1] == "__init__":
+        components.pop()
+
+    return ".".join(components)
 
 
 def get_file_contents(filename):
     """
-    Return contents of a file
+    Return contents of a file, or of standard input for "-"
     """
+    if is_stdin(filename):
+        return sys.stdin.read()
+
     with open(filename) as fd:
         return fd.read()
 
 
+def get_file_bytes(filename):
+    """
+    Return the undecoded contents of a file, or of standard input for "-"
+    """
+    if is_stdin(filename):
+        return sys.stdin.buffer.read()
+
+    with open(filename, "rb") as fd:
+        return fd.read()
+
+
+def get_file_size(filename):
+    """
+    Return the size of a file in bytes
+    """
+    return os.path.getsize(filename)
+
+
 def is_python_file(filename):
     """
     Return whether a file is a Python file or not
@@ -18,6 +68,57 @@ def is_python_file(filename):
     return filename.endswith('.py')
 
 
+def iter_paths(fd):
+    """
+    Yield the paths in a newline or NUL delimited list, e.g. the output of
+    "git ls-files -z". The delimiter is detected from the first chunk and
+    the list is read incrementally
+    """
+    delimiter = None
+    remainder = ""
+
+    while True:
+        chunk = fd.read(PATH_LIST_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        if delimiter is None:
+            delimiter = "\0" if "\0" in chunk else "\n"
+
+        paths = (remainder + chunk).split(delimiter)
+        remainder = paths.pop()
+
+        for path in paths:
+            if delimiter == "\n":
+                path = path.rstrip("\r")
+            if path:
+                yield path
+
+    if delimiter == "\n":
+        remainder = remainder.rstrip("\r")
+    if remainder:
+        yield remainder
+
+
+def get_python_files_from_list(filename):
+    """
+    Yield the Python filenames listed in a file, or in standard input for "-"
+    """
+    if is_stdin(filename):
+        paths = iter_paths(sys.stdin)
+    else:
+        fd = open(filename)
+        paths = iter_paths(fd)
+
+    try:
+        for path in paths:
+            if is_python_file(path):
+                yield path
+    finally:
+        if not is_stdin(filename):
+            fd.close()
+
+
 def recursively_get_files_from_directory(directory):
     """
     Return all filenames under recursively found in a directory
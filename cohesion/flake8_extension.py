@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 
 import cohesion
+from cohesion import pragma
 
 
 class CohesionChecker(object):
@@ -11,9 +12,10 @@ class CohesionChecker(object):
     _code = 'H601'
     _error_tmpl = 'H601 class has low ({0:.2f}%) cohesion'
 
-    def __init__(self, tree, filename):
+    def __init__(self, tree, filename, lines=None):
         self.tree = tree
         self.filename = filename
+        self.lines = lines
 
     @classmethod
     def add_options(cls, parser):
@@ -40,7 +42,15 @@ class CohesionChecker(object):
         cls.cohesion_below = options.cohesion_below
 
     def run(self):
+        ignored_lines = None
+        if self.lines is not None:
+            skip_file, ignored_lines = pragma.parse_pragmas("".join(self.lines))
+            if skip_file:
+                return
+
         file_module = cohesion.module.Module(self.tree)
+        if ignored_lines:
+            file_module.filter_lines(ignored_lines)
         file_module.filter_below(float(self.cohesion_below))
 
         for class_name in file_module.classes():
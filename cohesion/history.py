@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+
+import sqlite3
+import subprocess
+import time
+
+from . import baseline
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    commit_hash TEXT NOT NULL,
+    timestamp INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_timestamp ON runs (timestamp, id);
+CREATE INDEX IF NOT EXISTS runs_commit_hash ON runs (commit_hash);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    filename TEXT NOT NULL,
+    class_name TEXT NOT NULL,
+    cohesion REAL NOT NULL,
+    functions INTEGER NOT NULL,
+    variables INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scores_run_class ON scores (run_id, filename, class_name);
+CREATE INDEX IF NOT EXISTS scores_class ON scores (filename, class_name);
+"""
+
+REGRESSIONS_QUERY = """
+SELECT current.filename, current.class_name, previous.cohesion, current.cohesion
+FROM scores AS current
+JOIN scores AS previous
+    ON previous.run_id = ?
+    AND previous.filename = current.filename
+    AND previous.class_name = current.class_name
+WHERE current.run_id = ? AND current.cohesion < previous.cohesion
+ORDER BY current.filename, current.class_name
+"""
+
+
+def run_git(arguments, directory=None):
+    """
+    Return the stripped output of a git command
+    """
+    output = subprocess.check_output(
+        ["git"] + arguments,
+        cwd=directory,
+        stderr=subprocess.DEVNULL
+    )
+    return output.decode("utf-8").strip()
+
+
+def get_commit(revision="HEAD", directory=None):
+    """
+    Return the (hash, timestamp) pair of a git revision
+    """
+    commit_hash, timestamp = run_git(
+        ["show", "--no-patch", "--format=%H %ct", revision],
+        directory
+    ).split()
+
+    return commit_hash, int(timestamp)
+
+
+class History(object):
+    def __init__(self, filename):
+        self.connection = sqlite3.connect(filename)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.connection.commit()
+        else:
+            self.connection.rollback()
+        self.close()
+
+    def begin_run(self, commit_hash, timestamp=None):
+        """
+        Start recording a run and return its identifier. Nothing is committed
+        until commit() so a whole run is written in a single transaction
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+
+        cursor = self.connection.execute(
+            "INSERT INTO runs (commit_hash, timestamp) VALUES (?, ?)",
+            (commit_hash, timestamp)
+        )
+        return cursor.lastrowid
+
+    def add_module(self, run_id, filename, module_structure):
+        normalized_filename = baseline.normalize_filename(filename)
+
+        self.connection.executemany(
+            "INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    run_id,
+                    normalized_filename,
+                    class_name,
+                    class_structure["cohesion"],
+                    len(class_structure["functions"]),
+                    len(class_structure["variables"]),
+                )
+                for class_name, class_structure in module_structure.items()
+            )
+        )
+
+    def commit(self):
+        self.connection.commit()
+
+    def has_commit(self, commit_hash):
+        row = self.connection.execute(
+            "SELECT 1 FROM runs WHERE commit_hash = ? LIMIT 1",
+            (commit_hash,)
+        ).fetchone()
+        return row is not None
+
+    def runs(self, limit=None):
+        """
+        Return (id, commit hash, timestamp) tuples of the most recent runs
+        in chronological order
+        """
+        query = "SELECT id, commit_hash, timestamp FROM runs ORDER BY timestamp DESC, id DESC"
+        parameters = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters = (limit,)
+
+        rows = self.connection.execute(query, parameters).fetchall()
+        rows.reverse()
+        return rows
+
+    def regressions(self, previous_run_id, current_run_id):
+        """
+        Return (filename, class name, previous cohesion, current cohesion)
+        tuples for classes whose cohesion dropped between two runs
+        """
+        return self.connection.execute(
+            REGRESSIONS_QUERY,
+            (previous_run_id, current_run_id)
+        ).fetchall()
+
+    def trend(self, run_count=2):
+        """
+        Yield (previous run, current run, regressions) tuples for each pair of
+        consecutive runs among the most recent run_count runs
+        """
+        runs = self.runs(run_count)
+
+        for previous_run, current_run in zip(runs, runs[1:]):
+            yield previous_run, current_run, self.regressions(previous_run[0], current_run[0])
@@ -1,20 +1,45 @@
 #!/usr/bin/env python
 
-from __future__ import division
-
 import collections
 import operator
 
+from . import baseline
+from . import cluster
 from . import parser
 from . import filesystem
+from . import pragma
+from . import scoring
+
+SKIPPED_METHOD_FLAGS = frozenset([
+    parser.PROPERTY_FLAG,
+    parser.OVERLOAD_FLAG,
+])
+
+
+class ModuleTooLarge(Exception):
+    pass
+
+
+class ModuleSkipped(Exception):
+    pass
 
 
 class Module(object):
-    def __init__(self, module_ast_node):
-        self.structure = self._create_structure(module_ast_node)
+    def __init__(self, module_ast_node, nested_scopes=parser.NESTED_SCOPES_INCLUDE,
+                 low_memory=False, max_classes=None, class_filter=None):
+        self.structure = self._create_structure(
+            module_ast_node,
+            nested_scopes,
+            low_memory,
+            max_classes,
+            class_filter
+        )
 
-        for class_name in self.structure.keys():
-            self.class_cohesion_percentage(class_name)
+        class_structures = list(self.structure.values())
+        cohesion_percentages = scoring.class_cohesion_percentages(class_structures)
+
+        for class_structure, cohesion_percentage in zip(class_structures, cohesion_percentages):
+            class_structure["cohesion"] = cohesion_percentage
 
     def classes(self):
         return list(self.structure.keys())
@@ -28,17 +53,57 @@ class Module(object):
     def function_variables(self, class_name, function_name):
         return self.structure[class_name]["functions"][function_name]["variables"]
 
+    def class_clusters(self, class_name):
+        return cluster.get_class_clusters(self.structure[class_name])
+
     @classmethod
-    def from_file(cls, filename):
-        file_contents = filesystem.get_file_contents(filename)
+    def from_file(cls, filename, max_file_size=None, **kwargs):
+        if max_file_size is not None and not filesystem.is_stdin(filename):
+            file_size = filesystem.get_file_size(filename)
+            if file_size > max_file_size:
+                raise ModuleTooLarge(
+                    "file size of {} bytes exceeds the limit of {} bytes".format(
+                        file_size,
+                        max_file_size
+                    )
+                )
+
+        if kwargs.get("prefilter"):
+            # Classless files are skipped without decoding them, and the
+            # parser decodes the rest according to their coding declaration
+            file_contents = filesystem.get_file_bytes(filename)
+        else:
+            file_contents = filesystem.get_file_contents(filename)
 
-        return cls.from_string(file_contents)
+        return cls.from_string(file_contents, **kwargs)
 
     @classmethod
-    def from_string(cls, python_string):
+    def from_structure(cls, structure):
+        """
+        Return a module from a structure that was already created, e.g. by
+        another process
+        """
+        result = cls.__new__(cls)
+        result.structure = structure
+
+        return result
+
+    @classmethod
+    def from_string(cls, python_string, prefilter=False, **kwargs):
+        skip_file, ignored_lines = pragma.parse_pragmas(python_string)
+        if skip_file:
+            raise ModuleSkipped("file has a cohesion: skip-file pragma")
+
+        if prefilter and not parser.may_define_class(python_string):
+            python_string = ""
+
         module_ast_node = parser.get_ast_node_from_string(python_string)
 
-        return cls(module_ast_node)
+        result = cls(module_ast_node, **kwargs)
+        if ignored_lines:
+            result.filter_lines(ignored_lines)
+
+        return result
 
     def _filter(self, predicate=lambda class_name: True):
         self.structure = {
@@ -51,24 +116,7 @@ class Module(object):
         if self.structure[class_name]["cohesion"] is not None:
             return self.structure[class_name]["cohesion"]
 
-        total_function_variable_count = sum(
-            len(function_structure["variables"])
-            for function_structure in
-            self.structure[class_name]["functions"].values()
-        )
-
-        total_class_variable_count = (
-            len(self.structure[class_name]["variables"])
-            * len(self.structure[class_name]["functions"])
-        )
-
-        if total_class_variable_count != 0.0:
-            class_percentage = round((
-                total_function_variable_count
-                / total_class_variable_count
-            ) * 100, 2)
-        else:
-            class_percentage = 0.0
+        class_percentage = scoring.class_cohesion_percentage(self.structure[class_name])
 
         self.structure[class_name]["cohesion"] = class_percentage
 
@@ -88,56 +136,103 @@ class Module(object):
 
         self._filter(predicate)
 
-    @staticmethod
-    def _create_structure(file_ast_node):
-        module_classes = parser.get_module_classes(file_ast_node)
+    def filter_ignored(self, is_class_ignored):
+        def predicate(class_name):
+            return not is_class_ignored(class_name)
 
-        result = collections.defaultdict(dict)
+        self._filter(predicate)
 
-        for module_class in module_classes:
-            class_name = parser.get_object_name(module_class)
+    def filter_lines(self, ignored_lines):
+        def predicate(class_name):
+            return self.structure[class_name]["lineno"] not in ignored_lines
 
-            class_variable_names = list(parser.get_all_class_variable_names(module_class))
+        self._filter(predicate)
 
-            class_methods = parser.get_class_methods(module_class)
+    def filter_baseline(self, previous_baseline, filename):
+        for class_name in self.structure:
+            self.class_cohesion_percentage(class_name)
 
-            class_method_name_to_method = {
-                method.name: method
-                for method in class_methods
-            }
+        baseline_cohesions = previous_baseline.lookup_module(filename, self.structure)
 
-            class_method_name_to_variable_names = {
-                method_name: list(parser.get_all_class_variable_names_used_in_method(method))
-                for method_name, method in class_method_name_to_method.items()
-            }
+        def predicate(class_name):
+            return baseline.is_new_or_regressed(
+                self.structure[class_name],
+                baseline_cohesions[class_name]
+            )
 
-            class_method_name_to_boundedness = {
-                method_name: parser.is_class_method_bound(method)
-                for method_name, method in class_method_name_to_method.items()
-            }
+        self._filter(predicate)
 
-            class_method_name_to_staticmethodness = {
-                method_name: parser.is_class_method_staticmethod(method)
-                for method_name, method in class_method_name_to_method.items()
+    @staticmethod
+    def _create_structure(file_ast_node, nested_scopes=parser.NESTED_SCOPES_INCLUDE,
+                          low_memory=False, max_classes=None, class_filter=None):
+        # Later definitions shadow earlier ones with the same qualified name,
+        # so only the surviving definition is analyzed
+        module_classes = dict(parser.get_module_classes_with_qualified_names(file_ast_node))
+
+        if class_filter is not None:
+            module_classes = {
+                class_name: module_class
+                for class_name, module_class in module_classes.items()
+                if class_filter(class_name)
             }
 
-            class_method_name_to_classmethodness = {
-                method_name: parser.is_class_method_classmethod(method)
-                for method_name, method in class_method_name_to_method.items()
-            }
+        if max_classes is not None and len(module_classes) > max_classes:
+            raise ModuleTooLarge(
+                "{} classes exceeds the limit of {} classes".format(
+                    len(module_classes),
+                    max_classes
+                )
+            )
+
+        pending_classes = list(module_classes.items())
+        pending_classes.reverse()
+        del module_classes
+
+        result = collections.defaultdict(dict)
+
+        while pending_classes:
+            class_name, module_class = pending_classes.pop()
+
+            # Decorators are resolved once per method and passed down
+            class_decorator_flags = parser.get_class_decorator_flags(module_class)
+
+            class_variable_names = list(parser.get_all_class_variable_names(
+                module_class,
+                nested_scopes,
+                class_decorator_flags
+            ))
+
+            functions = {}
+
+            for method, decorator_flags in class_decorator_flags.items():
+                # Property-like accessors are treated as class variables and
+                # overloads are only type signatures for the implementation
+                if decorator_flags & SKIPPED_METHOD_FLAGS:
+                    continue
+
+                functions[method.name] = {
+                    "variables": list(parser.get_all_class_variable_names_used_in_method(
+                        method,
+                        nested_scopes,
+                        class_decorator_flags
+                    )),
+                    "bounded": parser.get_method_bound_name(method, decorator_flags) is not None,
+                    "staticmethod": parser.STATICMETHOD_FLAG in decorator_flags,
+                    "classmethod": parser.CLASSMETHOD_FLAG in decorator_flags,
+                }
 
             result[class_name]["cohesion"] = None
             result[class_name]["lineno"] = module_class.lineno
             result[class_name]["col_offset"] = module_class.col_offset
             result[class_name]["variables"] = class_variable_names
-            result[class_name]["functions"] = {
-                method_name: {
-                    "variables": class_method_name_to_variable_names[method_name],
-                    "bounded": class_method_name_to_boundedness[method_name],
-                    "staticmethod": class_method_name_to_staticmethodness[method_name],
-                    "classmethod": class_method_name_to_classmethodness[method_name],
-                }
-                for method_name in class_method_name_to_method.keys()
-            }
+            result[class_name]["functions"] = functions
+
+            if low_memory:
+                # Release the class subtree as soon as it is summarized. Nested
+                # classes are still referenced by pending_classes
+                module_class.body = []
+                module_class.decorator_list = []
+                module_class.bases = []
+                module_class.keywords = []
 
         return result
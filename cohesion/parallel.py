@@ -0,0 +1,336 @@
+#!/usr/bin/env python
+
+import array
+import collections
+import functools
+import itertools
+import mmap
+import multiprocessing
+import os
+import queue
+import struct
+import tempfile
+
+from . import module
+
+CHUNK_SIZE = 32
+
+# Chunks in flight per worker. This bounds the finished results held while
+# waiting for the next chunk in sequence, and keeps workers busy meanwhile
+WINDOW_CHUNKS_PER_JOB = 4
+
+FILE_ANALYZED = 0
+FILE_TOO_LARGE = 1
+FILE_SKIPPED = 2
+FILE_INVALID = 3
+
+SKIPPED_EXCEPTIONS = {
+    FILE_TOO_LARGE: module.ModuleTooLarge,
+    FILE_SKIPPED: module.ModuleSkipped,
+    FILE_INVALID: SyntaxError,
+}
+
+# Function flags, shared with the binary result file format
+BOUNDED_FLAG = 1
+STATICMETHOD_FLAG = 2
+CLASSMETHOD_FLAG = 4
+
+# Float count, integer count and string table size
+HEADER = struct.Struct("<QQQ")
+
+# Memory backed on Linux, so result files never touch a disk
+SHARED_MEMORY_DIRECTORY = "/dev/shm"
+
+
+def encode_function_flags(function_structure):
+    """
+    Return the flags of a function structure packed into an integer
+    """
+    return (
+        (BOUNDED_FLAG if function_structure["bounded"] else 0)
+        | (STATICMETHOD_FLAG if function_structure["staticmethod"] else 0)
+        | (CLASSMETHOD_FLAG if function_structure["classmethod"] else 0)
+    )
+
+
+def decode_function_flags(flags):
+    """
+    Return the function structure entries of flags packed by
+    encode_function_flags
+    """
+    return {
+        "bounded": bool(flags & BOUNDED_FLAG),
+        "staticmethod": bool(flags & STATICMETHOD_FLAG),
+        "classmethod": bool(flags & CLASSMETHOD_FLAG),
+    }
+
+
+class ResultWriter(object):
+    """
+    Encode the results of several files into columns: one of cohesion
+    percentages, one of integers describing files, classes and functions and
+    a table of the strings they reference
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.floats = array.array("d")
+        self.integers = array.array("i")
+
+    def string_id(self, string):
+        return self.strings.setdefault(string, len(self.strings))
+
+    def add_module(self, filename, module_structure):
+        integers = self.integers
+        string_id = self.string_id
+
+        integers.extend((string_id(filename), FILE_ANALYZED, len(module_structure)))
+
+        for class_name, class_structure in module_structure.items():
+            self.floats.append(class_structure["cohesion"])
+            integers.extend((
+                string_id(class_name),
+                class_structure["lineno"],
+                class_structure["col_offset"],
+                len(class_structure["variables"]),
+            ))
+            integers.extend(string_id(variable) for variable in class_structure["variables"])
+            integers.append(len(class_structure["functions"]))
+
+            for function_name, function_structure in class_structure["functions"].items():
+                integers.extend((
+                    string_id(function_name),
+                    encode_function_flags(function_structure),
+                    len(function_structure["variables"]),
+                ))
+                integers.extend(string_id(variable) for variable in function_structure["variables"])
+
+    def add_skipped(self, filename, status, message):
+        self.integers.extend((self.string_id(filename), status, self.string_id(message)))
+
+    def write(self, fd):
+        string_table = "\0".join(self.strings).encode("utf-8")
+
+        fd.write(HEADER.pack(len(self.floats), len(self.integers), len(string_table)))
+        # Floats come first so that they are aligned after the header
+        self.floats.tofile(fd)
+        self.integers.tofile(fd)
+        fd.write(string_table)
+
+
+def get_strings(strings, integers, position, count):
+    return [strings[integers[index]] for index in range(position, position + count)]
+
+
+def read_results(buffer):
+    """
+    Return (filename, module or exception) pairs from a buffer written by
+    ResultWriter. The columns are read in place rather than copied
+    """
+    float_count, integer_count, string_table_size = HEADER.unpack_from(buffer)
+
+    view = memoryview(buffer)
+    offset = HEADER.size
+    floats = view[offset:offset + float_count * 8].cast("d")
+    offset += float_count * 8
+    integers = view[offset:offset + integer_count * 4].cast("i")
+    offset += integer_count * 4
+    strings = bytes(view[offset:offset + string_table_size]).decode("utf-8").split("\0")
+
+    results = []
+    position = 0
+    float_position = 0
+
+    try:
+        while position < integer_count:
+            filename, status = strings[integers[position]], integers[position + 1]
+            position += 2
+
+            if status != FILE_ANALYZED:
+                results.append((filename, SKIPPED_EXCEPTIONS[status](strings[integers[position]])))
+                position += 1
+                continue
+
+            class_count = integers[position]
+            position += 1
+            module_structure = {}
+
+            for _ in range(class_count):
+                class_name = strings[integers[position]]
+                lineno = integers[position + 1]
+                col_offset = integers[position + 2]
+                variable_count = integers[position + 3]
+                position += 4
+                variables = get_strings(strings, integers, position, variable_count)
+                position += variable_count
+
+                function_count = integers[position]
+                position += 1
+                functions = {}
+
+                for _ in range(function_count):
+                    function_name = strings[integers[position]]
+                    flags = integers[position + 1]
+                    variable_count = integers[position + 2]
+                    position += 3
+                    function_structure = {
+                        "variables": get_strings(strings, integers, position, variable_count),
+                    }
+                    function_structure.update(decode_function_flags(flags))
+                    functions[function_name] = function_structure
+                    position += variable_count
+
+                module_structure[class_name] = {
+                    "cohesion": floats[float_position],
+                    "lineno": lineno,
+                    "col_offset": col_offset,
+                    "variables": variables,
+                    "functions": functions,
+                }
+                float_position += 1
+
+            results.append((filename, module.Module.from_structure(module_structure)))
+    finally:
+        # The underlying buffer cannot be closed while views of it exist
+        floats.release()
+        integers.release()
+        view.release()
+
+    return results
+
+
+def analyze_file(filename, skip_invalid=False, **kwargs):
+    """
+    Return the module of a file, or the ModuleTooLarge or ModuleSkipped
+    exception that prevented analyzing it. With skip_invalid, files that
+    cannot be parsed or decoded are returned as a SyntaxError too
+    """
+    try:
+        return module.Module.from_file(filename, **kwargs)
+    except (module.ModuleTooLarge, module.ModuleSkipped) as e:
+        return e
+    except (SyntaxError, ValueError) as e:
+        if not skip_invalid:
+            raise
+        return SyntaxError(str(e))
+
+
+def analyze_chunk(filenames, directory, options):
+    """
+    Analyze files in a worker and write their results to a new file in
+    directory. Return its path
+    """
+    writer = ResultWriter()
+
+    for filename in filenames:
+        result = analyze_file(filename, **options)
+        if isinstance(result, module.ModuleTooLarge):
+            writer.add_skipped(filename, FILE_TOO_LARGE, str(result))
+        elif isinstance(result, module.ModuleSkipped):
+            writer.add_skipped(filename, FILE_SKIPPED, str(result))
+        elif isinstance(result, SyntaxError):
+            writer.add_skipped(filename, FILE_INVALID, str(result))
+        else:
+            writer.add_module(filename, result.structure)
+
+    fd, path = tempfile.mkstemp(dir=directory)
+    with os.fdopen(fd, "wb") as result_fd:
+        writer.write(result_fd)
+
+    return path
+
+
+def read_chunk(path):
+    with open(path, "rb") as fd:
+        with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            results = read_results(buffer)
+
+    os.remove(path)
+
+    return results
+
+
+def get_chunks(iterable, chunk_size):
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def get_transport_directory():
+    if os.path.isdir(SHARED_MEMORY_DIRECTORY) and os.access(SHARED_MEMORY_DIRECTORY, os.W_OK):
+        return SHARED_MEMORY_DIRECTORY
+
+    return None
+
+
+class ReorderBuffer(object):
+    """
+    Run chunks in a pool with at most window chunks in flight, and yield
+    their results in submission order, each as soon as it and every earlier
+    chunk are done, or in completion order if not ordered
+    """
+
+    def __init__(self, pool, worker, chunks, window, ordered=True):
+        self.pool = pool
+        self.worker = worker
+        self.chunks = iter(chunks)
+        self.window = window
+        self.ordered = ordered
+        self.pending = collections.deque()
+        self.completed = queue.Queue()
+        self.in_flight = 0
+
+    def submit(self):
+        for chunk in self.chunks:
+            if self.ordered:
+                self.pending.append(self.pool.apply_async(self.worker, (chunk,)))
+            else:
+                self.pool.apply_async(
+                    self.worker,
+                    (chunk,),
+                    callback=self.completed.put,
+                    error_callback=self.completed.put
+                )
+
+            self.in_flight += 1
+            if self.in_flight >= self.window:
+                return
+
+    def __iter__(self):
+        self.submit()
+
+        while self.in_flight:
+            if self.ordered:
+                result = self.pending.popleft().get()
+            else:
+                result = self.completed.get()
+                if isinstance(result, BaseException):
+                    raise result
+
+            self.in_flight -= 1
+            self.submit()
+
+            yield result
+
+
+def analyze_files(filenames, jobs, chunk_size=CHUNK_SIZE, ordered=True, **kwargs):
+    """
+    Yield (filename, module or exception) pairs, analyzing chunks of files in
+    jobs worker processes. Pairs are in input order unless not ordered, in
+    which case chunks are yielded as they finish. Workers return their
+    results through memory mapped files instead of pickling them
+    """
+    with tempfile.TemporaryDirectory(prefix="cohesion-", dir=get_transport_directory()) as directory:
+        worker = functools.partial(analyze_chunk, directory=directory, options=kwargs)
+
+        with multiprocessing.Pool(jobs) as pool:
+            chunks = get_chunks(filenames, chunk_size)
+            window = jobs * WINDOW_CHUNKS_PER_JOB
+
+            for path in ReorderBuffer(pool, worker, chunks, window, ordered):
+                for result in read_chunk(path):
+                    yield result
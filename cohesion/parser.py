@@ -1,28 +1,81 @@
 #!/usr/bin/env python
 
 import ast
+import collections
+import re
 
 BOUND_METHOD_ARGUMENT_NAME = "self"
 
+NESTED_SCOPES_INCLUDE = "include"
+NESTED_SCOPES_EXCLUDE = "exclude"
+NESTED_SCOPES_POLICIES = (NESTED_SCOPES_INCLUDE, NESTED_SCOPES_EXCLUDE)
+
+SLOTS_NAME = "__slots__"
+PROPERTY_DECORATOR_NAMES = frozenset([
+    "property",
+    "cached_property",
+    "getter",
+    "setter",
+    "deleter",
+])
+
+STATICMETHOD_FLAG = "staticmethod"
+CLASSMETHOD_FLAG = "classmethod"
+PROPERTY_FLAG = "property"
+ABSTRACT_FLAG = "abstract"
+OVERLOAD_FLAG = "overload"
+
+DECORATOR_NAME_TO_FLAGS = {
+    "staticmethod": frozenset([STATICMETHOD_FLAG]),
+    "classmethod": frozenset([CLASSMETHOD_FLAG]),
+    "abstractmethod": frozenset([ABSTRACT_FLAG]),
+    "abstractstaticmethod": frozenset([ABSTRACT_FLAG, STATICMETHOD_FLAG]),
+    "abstractclassmethod": frozenset([ABSTRACT_FLAG, CLASSMETHOD_FLAG]),
+    "abstractproperty": frozenset([ABSTRACT_FLAG, PROPERTY_FLAG]),
+    "overload": frozenset([OVERLOAD_FLAG]),
+}
+DECORATOR_NAME_TO_FLAGS.update(
+    (decorator_name, frozenset([PROPERTY_FLAG]))
+    for decorator_name in PROPERTY_DECORATOR_NAMES
+)
+
+FUNCTION_DEF_TYPES = (ast.FunctionDef, ast.AsyncFunctionDef)
+NESTED_SCOPE_TYPES = FUNCTION_DEF_TYPES + (ast.Lambda, ast.ClassDef)
+
+# A class statement always starts a line, so a source without a match
+# defines no classes. Matches inside strings only cost a parse
+CLASS_STATEMENT_PATTERN = re.compile(r"^(?:\ufeff)?[ \t\f]*class[ \t\f\\]", re.MULTILINE)
+BYTES_CLASS_STATEMENT_PATTERN = re.compile(rb"^(?:\xef\xbb\xbf)?[ \t\f]*class[ \t\f\\]", re.MULTILINE)
+
+# Classes are statements, which expressions cannot contain, so only these
+# nodes can lead to a class. Match statements were added in Python 3.10
+CLASS_CONTAINER_TYPES = (ast.stmt, ast.excepthandler)
+if hasattr(ast, "match_case"):
+    CLASS_CONTAINER_TYPES += (ast.match_case,)
+
+NAME_DISPATCH = {
+    ast.Name: "id",
+    ast.Attribute: "attr",
+    ast.Call: "func",
+    ast.FunctionDef: "name",
+    ast.AsyncFunctionDef: "name",
+    ast.ClassDef: "name",
+    ast.Subscript: "value",
+    ast.arg: "arg",
+}
+
+EMPTY_FLAGS = frozenset()
+
 
 def get_object_name(obj):
     """
     Return the name of a given object
     """
-    name_dispatch = {
-        ast.Name: "id",
-        ast.Attribute: "attr",
-        ast.Call: "func",
-        ast.FunctionDef: "name",
-        ast.ClassDef: "name",
-        ast.Subscript: "value",
-        ast.arg: "arg",
-    }
-
     while not isinstance(obj, str):
-        if type(obj) not in name_dispatch:
+        attribute_name = NAME_DISPATCH.get(type(obj))
+        if attribute_name is None:
             return None
-        obj = getattr(obj, name_dispatch[type(obj)])
+        obj = getattr(obj, attribute_name)
 
     return obj
 
@@ -36,41 +89,58 @@ def get_attribute_name_id(attr):
 
 def is_class_method_bound(method, arg_name=BOUND_METHOD_ARGUMENT_NAME):
     """
-    Return whether a class method is bound to the class
+    Return whether a class method is bound to the class through a first
+    parameter named arg_name
     """
-    if not method.args.args:
-        return False
+    return get_method_bound_name(method) == arg_name
 
-    first_arg = method.args.args[0]
 
-    first_arg_name = get_object_name(first_arg)
+def get_method_decorator_flags(method):
+    """
+    Return the set of flags, e.g. staticmethod or property, that the
+    decorators of a method resolve to. Resolve these once per method and
+    pass the result down rather than calling the is_class_method_* helpers
+    repeatedly
+    """
+    flags = EMPTY_FLAGS
 
-    return first_arg_name is not None and first_arg_name == arg_name
+    for dec in method.decorator_list:
+        decorator_flags = DECORATOR_NAME_TO_FLAGS.get(get_object_name(dec))
+        if decorator_flags is not None:
+            flags = flags | decorator_flags
+
+    return flags
 
 
 def class_method_has_decorator(method, decorator):
     """
     Return whether a class method has a specific decorator
     """
-    return decorator in [
-        object_name
+    return any(
+        get_object_name(dec) == decorator
         for dec in method.decorator_list
-        if (object_name := get_object_name(dec)) is not None
-    ]
+    )
 
 
 def is_class_method_classmethod(method):
     """
     Return whether a class method is a classmethod
     """
-    return class_method_has_decorator(method, "classmethod")
+    return CLASSMETHOD_FLAG in get_method_decorator_flags(method)
 
 
 def is_class_method_staticmethod(method):
     """
     Return whether a class method is a staticmethod
     """
-    return class_method_has_decorator(method, "staticmethod")
+    return STATICMETHOD_FLAG in get_method_decorator_flags(method)
+
+
+def is_class_method_property(method):
+    """
+    Return whether a class method is a property-like accessor
+    """
+    return PROPERTY_FLAG in get_method_decorator_flags(method)
 
 
 def get_class_methods(cls):
@@ -80,10 +150,20 @@ def get_class_methods(cls):
     return [
         node
         for node in cls.body
-        if isinstance(node, ast.FunctionDef)
+        if isinstance(node, FUNCTION_DEF_TYPES)
     ]
 
 
+def get_class_decorator_flags(cls):
+    """
+    Return a dict mapping each method of a given class to its decorator flags
+    """
+    return {
+        method: get_method_decorator_flags(method)
+        for method in get_class_methods(cls)
+    }
+
+
 def get_class_variables(cls):
     """
     Return class variables associated with a given class
@@ -91,77 +171,365 @@ def get_class_variables(cls):
     return [
         target
         for node in cls.body
-        if isinstance(node, ast.Assign)
-        for target in node.targets
+        if isinstance(node, (ast.Assign, ast.AnnAssign))
+        for target in (node.targets if isinstance(node, ast.Assign) else [node.target])
     ]
 
 
-def get_instance_variables(node, bound_name_classifier=BOUND_METHOD_ARGUMENT_NAME):
+_class_variable_discoverers = collections.defaultdict(list)
+
+
+def register_class_variable_discoverer(node_type, discoverer):
     """
-    Return instance variables used in an AST node
+    Register a function returning the class variable names defined by a class
+    body statement of a given AST node type. It is called with the statement
+    and its decorator flags, which are empty for anything but methods. This
+    is the extension point for framework conventions
     """
-    node_attributes = [
-        child
-        for child in ast.walk(node)
-        if isinstance(child, ast.Attribute)
-        and get_attribute_name_id(child) == bound_name_classifier
+    _class_variable_discoverers[node_type].append(discoverer)
+
+
+def unregister_class_variable_discoverer(node_type, discoverer):
+    """
+    Remove a previously registered class variable discoverer
+    """
+    _class_variable_discoverers[node_type].remove(discoverer)
+
+
+def get_string_constants(node):
+    """
+    Return the string constants of a string literal or of a tuple, list, set
+    or dict of string literals
+    """
+    if isinstance(node, ast.Dict):
+        elements = node.keys
+    elif isinstance(node, (ast.Tuple, ast.List, ast.Set)):
+        elements = node.elts
+    else:
+        elements = [node]
+
+    return [
+        element.value
+        for element in elements
+        if isinstance(element, ast.Constant) and isinstance(element.value, str)
     ]
-    node_function_call_names = [
-        object_name
-        for child in ast.walk(node)
-        if isinstance(child, ast.Call)
-        and (object_name := get_object_name(child)) is not None
+
+
+def get_target_names(target):
+    """
+    Return the names bound by an assignment target
+    """
+    if isinstance(target, (ast.Tuple, ast.List)):
+        return [
+            name
+            for element in target.elts
+            for name in get_target_names(element)
+        ]
+
+    if isinstance(target, ast.Starred):
+        return get_target_names(target.value)
+
+    if isinstance(target, ast.Name):
+        return [target.id]
+
+    return []
+
+
+def discover_assignment_variables(node, decorator_flags=EMPTY_FLAGS):
+    """
+    Return class variables defined by plain and annotated assignments,
+    expanding __slots__ into the attribute names it declares
+    """
+    targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+    names = []
+
+    for target in targets:
+        for name in get_target_names(target):
+            if name == SLOTS_NAME:
+                if node.value is not None:
+                    names.extend(get_string_constants(node.value))
+            else:
+                names.append(name)
+
+    return names
+
+
+def discover_property_variables(node, decorator_flags=EMPTY_FLAGS):
+    """
+    Return the attribute name of property-like accessors
+    """
+    return [node.name] if PROPERTY_FLAG in decorator_flags else []
+
+
+register_class_variable_discoverer(ast.Assign, discover_assignment_variables)
+register_class_variable_discoverer(ast.AnnAssign, discover_assignment_variables)
+register_class_variable_discoverer(ast.FunctionDef, discover_property_variables)
+register_class_variable_discoverer(ast.AsyncFunctionDef, discover_property_variables)
+
+
+def get_class_variable_definitions(cls, decorator_flags=None):
+    """
+    Return (class body statement, name) pairs of the class variables that the
+    registered discoverers find in a given class
+    """
+    if decorator_flags is None:
+        decorator_flags = get_class_decorator_flags(cls)
+
+    return [
+        (node, name)
+        for node in cls.body
+        for discoverer in _class_variable_discoverers.get(type(node), ())
+        for name in discoverer(node, decorator_flags.get(node, EMPTY_FLAGS))
+    ]
+
+
+def get_class_variable_names(cls, decorator_flags=None):
+    """
+    Return the names of class variables declared in the body of a given class
+    """
+    return {
+        name
+        for _, name in get_class_variable_definitions(cls, decorator_flags)
+    }
+
+
+def get_scope_children(node, root, nested_scopes=NESTED_SCOPES_INCLUDE):
+    """
+    Return the children of an AST node that belong to the scope being
+    analyzed. When nested_scopes is "exclude", functions, lambdas and classes
+    nested inside of a method are skipped. The methods of a class passed as
+    the root are always included
+    """
+    children = list(ast.iter_child_nodes(node))
+
+    if nested_scopes == NESTED_SCOPES_INCLUDE:
+        return children
+
+    is_root_class = node is root and isinstance(node, ast.ClassDef)
+
+    return [
+        child
+        for child in children
+        if not isinstance(child, NESTED_SCOPE_TYPES)
+        or (is_root_class and isinstance(child, FUNCTION_DEF_TYPES))
     ]
-    node_instance_variables = [
-        attribute
-        for attribute in node_attributes
-        if get_object_name(attribute) not in node_function_call_names
+
+
+def get_method_bound_name(method, decorator_flags=None):
+    """
+    Return the name a method uses to refer to its instance or class, i.e. its
+    first positional parameter. Return None for staticmethods and methods
+    without positional parameters
+    """
+    if decorator_flags is None:
+        decorator_flags = get_method_decorator_flags(method)
+
+    if STATICMETHOD_FLAG in decorator_flags:
+        return None
+
+    positional_args = method.args.posonlyargs + method.args.args
+    if not positional_args:
+        return None
+
+    return get_object_name(positional_args[0])
+
+
+def get_bound_name_aliases(node, bound_names):
+    """
+    Return the names that an assignment makes aliases of a bound name, e.g.
+    "s" for "s = self"
+    """
+    if isinstance(node, ast.Assign):
+        value, targets = node.value, node.targets
+    elif isinstance(node, ast.NamedExpr):
+        value, targets = node.value, [node.target]
+    else:
+        return []
+
+    if not isinstance(value, ast.Name) or value.id not in bound_names:
+        return []
+
+    return [
+        target.id
+        for target in targets
+        if isinstance(target, ast.Name)
     ]
+
+
+def get_instance_variables(node, bound_name_classifier=None,
+                           nested_scopes=NESTED_SCOPES_INCLUDE, decorator_flags=None):
+    """
+    Return instance variables used in an AST node. Attributes are matched
+    against the first parameter of their enclosing method, or against
+    bound_name_classifier if specified, and any local aliases of it.
+    decorator_flags maps methods to their already resolved decorator flags.
+    Attributes that are called, e.g. self.func(), are method calls rather
+    than variables. The bodies of classes nested in a class are skipped, as
+    those classes are analyzed on their own
+    """
+    infer_bound_names = bound_name_classifier is None
+    if decorator_flags is None:
+        decorator_flags = {}
+    is_root_class = isinstance(node, ast.ClassDef)
+    initial_bound_names = set() if infer_bound_names else {bound_name_classifier}
+
+    node_instance_variables = []
+
+    stack = [(node, initial_bound_names, isinstance(node, FUNCTION_DEF_TYPES), False)]
+
+    while stack:
+        current, bound_names, is_method, is_called = stack.pop()
+
+        if is_method and infer_bound_names:
+            bound_name = get_method_bound_name(current, decorator_flags.get(current))
+            bound_names = {bound_name} if bound_name is not None else set()
+
+        if isinstance(current, ast.Attribute):
+            if not is_called and get_attribute_name_id(current) in bound_names:
+                node_instance_variables.append(current)
+        else:
+            bound_names.update(get_bound_name_aliases(current, bound_names))
+
+        is_class = isinstance(current, ast.ClassDef)
+        if is_class and infer_bound_names:
+            bound_names = set()
+
+        called_func = current.func if isinstance(current, ast.Call) else None
+
+        stack.extend(
+            (
+                child,
+                bound_names,
+                is_class and isinstance(child, FUNCTION_DEF_TYPES),
+                child is called_func,
+            )
+            for child in reversed(get_scope_children(current, node, nested_scopes))
+            if not (is_root_class and isinstance(child, ast.ClassDef))
+        )
+
     return node_instance_variables
 
 
-def get_all_class_variable_names_used_in_method(method):
+def get_all_class_variable_names_used_in_method(method, nested_scopes=NESTED_SCOPES_INCLUDE,
+                                                decorator_flags=None):
     """
     Return the names of all instance variables associated with a
     given method
     """
     return {
         object_name
-        for variable in get_instance_variables(method)
+        for variable in get_instance_variables(
+            method,
+            nested_scopes=nested_scopes,
+            decorator_flags=decorator_flags
+        )
         if (object_name := get_object_name(variable)) is not None
     }
 
 
-def get_all_class_variables(cls):
+def get_all_class_variables(cls, nested_scopes=NESTED_SCOPES_INCLUDE):
     """
-    Return class and instance variables associated with a given class
+    Return class and instance variables associated with a given class. Class
+    variables are Name nodes located at the statement that defines them
     """
-    return get_class_variables(cls) + get_instance_variables(cls)
+    decorator_flags = get_class_decorator_flags(cls)
 
+    class_variables = [
+        ast.copy_location(ast.Name(id=name, ctx=ast.Store()), node)
+        for node, name in get_class_variable_definitions(cls, decorator_flags)
+    ]
+
+    return class_variables + get_instance_variables(
+        cls,
+        nested_scopes=nested_scopes,
+        decorator_flags=decorator_flags
+    )
 
-def get_all_class_variable_names(cls):
+
+def get_all_class_variable_names(cls, nested_scopes=NESTED_SCOPES_INCLUDE, decorator_flags=None):
     """
     Return the names of all class and instance variables associated with a
     given class
     """
-    return {
+    if decorator_flags is None:
+        decorator_flags = get_class_decorator_flags(cls)
+
+    return get_class_variable_names(cls, decorator_flags) | {
         object_name
-        for variable in get_all_class_variables(cls)
+        for variable in get_instance_variables(
+            cls,
+            nested_scopes=nested_scopes,
+            decorator_flags=decorator_flags
+        )
         if (object_name := get_object_name(variable)) is not None
     }
 
 
+def get_module_classes_with_qualified_names(node):
+    """
+    Return (qualified name, class) pairs associated with a given module in
+    source order. Qualified names follow the __qualname__ convention, e.g.
+    "Outer.Inner" or "func.<locals>.Cls"
+    """
+    result = []
+    stack = [(node, "")]
+
+    while stack:
+        parent, prefix = stack.pop()
+
+        if isinstance(parent, ast.ClassDef):
+            qualified_name = prefix + parent.name
+            result.append((qualified_name, parent))
+            prefix = qualified_name + "."
+        elif isinstance(parent, FUNCTION_DEF_TYPES):
+            prefix = prefix + parent.name + ".<locals>."
+
+        stack.extend(
+            (child, prefix)
+            for child in reversed(list(ast.iter_child_nodes(parent)))
+            if may_contain_class(child)
+        )
+
+    return result
+
+
+def may_contain_class(node):
+    """
+    Return whether a node is or may contain a class definition
+    """
+    if isinstance(node, ast.ClassDef):
+        return True
+
+    if not isinstance(node, CLASS_CONTAINER_TYPES):
+        return False
+
+    # Statements on a single line can only have simple statements in their
+    # body. Nodes built without positions do not have end_lineno
+    end_lineno = getattr(node, "end_lineno", None)
+    return end_lineno is None or end_lineno != node.lineno
+
+
 def get_module_classes(node):
     """
     Return classes associated with a given module
     """
     return [
-        child
-        for child in ast.walk(node)
-        if isinstance(child, ast.ClassDef)
+        cls
+        for _, cls in get_module_classes_with_qualified_names(node)
     ]
 
 
+def may_define_class(source):
+    """
+    Return whether a source string or bytes may define a class, without
+    parsing it
+    """
+    if isinstance(source, bytes):
+        return BYTES_CLASS_STATEMENT_PATTERN.search(source) is not None
+
+    return CLASS_STATEMENT_PATTERN.search(source) is not None
+
+
 def get_ast_node_from_string(string):
     """
     Return an AST node from a string
@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+
+import re
+
+IGNORE_PRAGMA = "ignore"
+SKIP_FILE_PRAGMA = "skip-file"
+
+PRAGMA_PATTERN = re.compile(r"#[ \t]*cohesion:[ \t]*(ignore|skip-file)\b")
+# Sources read from git objects are bytes
+BYTES_PRAGMA_PATTERN = re.compile(PRAGMA_PATTERN.pattern.encode("ascii"))
+
+
+def parse_pragmas(source):
+    """
+    Return whether the source has a skip-file pragma and the set of line
+    numbers that have an ignore pragma. Comments are found by scanning the
+    text rather than tokenizing it, so a pragma inside a string also counts
+    """
+    if isinstance(source, bytes):
+        pattern, newline, skip_file_pragma = BYTES_PRAGMA_PATTERN, b"\n", SKIP_FILE_PRAGMA.encode("ascii")
+    else:
+        pattern, newline, skip_file_pragma = PRAGMA_PATTERN, "\n", SKIP_FILE_PRAGMA
+
+    ignored_lines = set()
+    lineno = 1
+    position = 0
+
+    for match in pattern.finditer(source):
+        if match.group(1) == skip_file_pragma:
+            return True, set()
+
+        lineno += source.count(newline, position, match.start())
+        position = match.start()
+        ignored_lines.add(lineno)
+
+    return False, ignored_lines
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+
+import heapq
+import json
+import operator
+import zlib
+
+from . import baseline
+
+SORT_COHESION = "cohesion"
+SORT_METHODS = "methods"
+SORT_ATTRIBUTES = "attributes"
+SORT_KEYS = (SORT_COHESION, SORT_METHODS, SORT_ATTRIBUTES)
+
+
+def parse_shard(value):
+    """
+    Return the (index, count) pair of a shard specification such as "2/4".
+    Shard indices start at 1
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError("invalid shard {!r} please specify it as i/N".format(value))
+
+    if not 1 <= index <= count:
+        raise ValueError("invalid shard {!r} index must be between 1 and N".format(value))
+
+    return index, count
+
+
+def get_shard_index(filename, shard_count):
+    """
+    Return the 1-based shard a file belongs to. The assignment only depends
+    on the normalized path, so every machine computes the same partition
+    """
+    path = baseline.normalize_filename(filename).encode("utf-8")
+
+    return zlib.crc32(path) % shard_count + 1
+
+
+def filter_shard(filenames, shard_index, shard_count):
+    """
+    Return the sorted filenames belonging to a given shard
+    """
+    return sorted(
+        filename
+        for filename in filenames
+        if get_shard_index(filename, shard_count) == shard_index
+    )
+
+
+def dump_record(filename, module_structure):
+    """
+    Return a single JSON line describing the results of a file
+    """
+    return json.dumps(
+        {"filename": filename, "classes": module_structure},
+        separators=(',', ':'),
+        default=list
+    )
+
+
+def iter_records(fd):
+    """
+    Yield (filename, module_structure) pairs from a JSON lines result file
+    """
+    for line in fd:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        yield record["filename"], record["classes"]
+
+
+def check_sorted(records):
+    """
+    Yield (filename, module_structure) pairs, raising ValueError as soon as a
+    filename sorts before the one preceding it
+    """
+    previous_filename = None
+
+    for record in records:
+        if previous_filename is not None and record[0] < previous_filename:
+            raise ValueError("results are not sorted by filename: {!r} follows {!r}".format(
+                record[0],
+                previous_filename
+            ))
+        previous_filename = record[0]
+        yield record
+
+
+def merge_records(record_iterables):
+    """
+    Lazily merge several streams of (filename, module_structure) pairs that
+    are each sorted by filename into a single sorted stream
+    """
+    return heapq.merge(
+        *(check_sorted(records) for records in record_iterables),
+        key=operator.itemgetter(0)
+    )
+
+
+def rank_key(class_structure, sort=SORT_COHESION):
+    """
+    Return a key ordering classes from least to most cohesive, or from most
+    to fewest methods or attributes with the least cohesive first
+    """
+    cohesion = class_structure["cohesion"] or 0.0
+
+    if sort == SORT_METHODS:
+        return (-len(class_structure["functions"]), cohesion)
+    elif sort == SORT_ATTRIBUTES:
+        return (-len(class_structure["variables"]), cohesion)
+
+    return (cohesion,)
+
+
+class TopClasses(object):
+    """
+    Keep the worst count classes seen so far in a bounded heap, so ranking a
+    whole tree only holds count classes in memory
+    """
+
+    def __init__(self, count, sort=SORT_COHESION):
+        self.count = count
+        self.sort = sort
+        self.heap = []
+        self.class_count = 0
+
+    def add(self, filename, module_structure):
+        for class_name, class_structure in module_structure.items():
+            # The heap keeps its smallest entry on top, so keys are negated to
+            # make the best kept class the one that is replaced. Negating the
+            # arrival order makes earlier classes win ties
+            key = tuple(-value for value in rank_key(class_structure, self.sort))
+            entry = (key + (-self.class_count,), filename, class_name, class_structure)
+            self.class_count += 1
+
+            if len(self.heap) < self.count:
+                heapq.heappush(self.heap, entry)
+            elif entry[0] > self.heap[0][0]:
+                heapq.heapreplace(self.heap, entry)
+
+    def items(self):
+        """
+        Return (filename, class_name, class_structure) triples from worst to
+        best
+        """
+        return [
+            (filename, class_name, class_structure)
+            for _, filename, class_name, class_structure in sorted(self.heap, reverse=True)
+        ]
+
+
+class Summary(object):
+    def __init__(self):
+        self.file_count = 0
+        self.class_count = 0
+        self.cohesion_total = 0.0
+
+    def add(self, filename, module_structure):
+        self.file_count += 1
+        self.class_count += len(module_structure)
+        self.cohesion_total += sum(
+            class_structure["cohesion"] or 0.0
+            for class_structure in module_structure.values()
+        )
+
+    def average_cohesion(self):
+        if not self.class_count:
+            return 0.0
+
+        return round(self.cohesion_total / self.class_count, 2)
+
+    def __str__(self):
+        return "Files: {} Classes: {} Average: {}%".format(
+            self.file_count,
+            self.class_count,
+            self.average_cohesion()
+        )
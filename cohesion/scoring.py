@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+from __future__ import division
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKEND_PYTHON = "python"
+BACKEND_NUMPY = "numpy"
+
+# Below this many classes the cost of packing arrays outweighs vectorizing
+VECTORIZE_MIN_BATCH = 256
+
+# Percentages are at most 100, where float64 products are off by less than
+# 2e-14, so anything further than this from a rounding boundary is rounded
+# the same way by numpy and Python
+ROUNDING_TIE_TOLERANCE = 1e-9
+
+
+def class_cohesion_percentage(class_structure):
+    """
+    Return the cohesion percentage of a class structure
+    """
+    total_function_variable_count = sum(
+        len(function_structure["variables"])
+        for function_structure in
+        class_structure["functions"].values()
+    )
+
+    total_class_variable_count = (
+        len(class_structure["variables"])
+        * len(class_structure["functions"])
+    )
+
+    if total_class_variable_count != 0.0:
+        return round((
+            total_function_variable_count
+            / total_class_variable_count
+        ) * 100, 2)
+
+    return 0.0
+
+
+def get_default_backend(batch_size):
+    if numpy is not None and batch_size >= VECTORIZE_MIN_BATCH:
+        return BACKEND_NUMPY
+
+    return BACKEND_PYTHON
+
+
+def class_cohesion_percentages(class_structures, backend=None):
+    """
+    Return the cohesion percentage of each class structure. The NumPy backend
+    returns bit-identical results to class_cohesion_percentage
+    """
+    class_structures = list(class_structures)
+
+    if backend is None:
+        backend = get_default_backend(len(class_structures))
+
+    if backend == BACKEND_NUMPY:
+        if numpy is None:
+            raise ImportError("the numpy scoring backend requires NumPy to be installed")
+        return numpy_class_cohesion_percentages(class_structures)
+
+    return [
+        class_cohesion_percentage(class_structure)
+        for class_structure in class_structures
+    ]
+
+
+def pack_class_structures(class_structures):
+    """
+    Return packed arrays of per-function variable counts, per-class function
+    offsets into them, per-class function counts and per-class variable counts
+    """
+    function_counts = numpy.fromiter(
+        (len(class_structure["functions"]) for class_structure in class_structures),
+        dtype=numpy.int64,
+        count=len(class_structures)
+    )
+    variable_counts = numpy.fromiter(
+        (len(class_structure["variables"]) for class_structure in class_structures),
+        dtype=numpy.int64,
+        count=len(class_structures)
+    )
+    function_variable_counts = numpy.fromiter(
+        (
+            len(function_structure["variables"])
+            for class_structure in class_structures
+            for function_structure in class_structure["functions"].values()
+        ),
+        dtype=numpy.int64,
+        count=int(function_counts.sum())
+    )
+    offsets = numpy.concatenate(([0], numpy.cumsum(function_counts)[:-1]))
+
+    return function_variable_counts, offsets, function_counts, variable_counts
+
+
+def numpy_class_cohesion_percentages(class_structures):
+    if not class_structures:
+        return []
+
+    function_variable_counts, offsets, function_counts, variable_counts = (
+        pack_class_structures(class_structures)
+    )
+
+    # reduceat on an empty trailing segment would return an element instead
+    # of zero, so pad the counts with a sentinel
+    padded_counts = numpy.append(function_variable_counts, 0)
+    totals = numpy.add.reduceat(padded_counts, offsets)
+    totals[function_counts == 0] = 0
+
+    denominators = variable_counts * function_counts
+    has_denominator = denominators != 0
+
+    # Integer to float64 conversion and IEEE division and multiplication are
+    # exact or correctly rounded, matching Python's int / int * 100
+    percentages = numpy.zeros(len(class_structures), dtype=numpy.float64)
+    percentages[has_denominator] = (
+        totals[has_denominator].astype(numpy.float64)
+        / denominators[has_denominator].astype(numpy.float64)
+    ) * 100
+
+    scaled = percentages * 100
+    rounded = numpy.rint(scaled) / 100
+
+    # Python's round() is exact, so values close to a rounding boundary
+    # are delegated to it
+    distance = numpy.abs(scaled - numpy.floor(scaled) - 0.5)
+    result = rounded.tolist()
+    for index in numpy.flatnonzero(distance < ROUNDING_TIE_TOLERANCE).tolist():
+        result[index] = round(float(percentages[index]), 2)
+
+    return result
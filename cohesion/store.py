@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+
+import array
+import mmap
+import struct
+import sys
+
+from . import baseline
+from . import parallel
+
+STORE_MAGIC = b"COHB"
+STORE_VERSION = 1
+
+# Magic, version, then the string, file, class, function and variable
+# counts and the size of the string data
+HEADER = struct.Struct("<4sHHIIIIII")
+
+# Every section after the header is an array of little-endian uint32 words:
+# string offsets, the file index, class records, function records and
+# variable string ids, followed by the UTF-8 string data
+FILE_RECORD_WORDS = 3
+CLASS_RECORD_WORDS = 9
+FUNCTION_RECORD_WORDS = 4
+
+# Cohesion percentages have two decimals, so they are stored as exact
+# integer hundredths
+COHESION_SCALE = 100
+
+
+def is_store_file(filename):
+    """
+    Return whether a file is a binary result file
+    """
+    with open(filename, "rb") as fd:
+        return fd.read(len(STORE_MAGIC)) == STORE_MAGIC
+
+
+class StoreWriter(object):
+    """
+    Accumulate the results of a run and write them as a binary result file
+    of fixed-width records indexed by filename
+    """
+
+    def __init__(self):
+        self.strings = {}
+        self.modules = []
+        self.classes = array.array("I")
+        self.functions = array.array("I")
+        self.variables = array.array("I")
+
+    def string_id(self, string):
+        return self.strings.setdefault(string, len(self.strings))
+
+    def add(self, filename, module_structure):
+        string_id = self.string_id
+        first_class = len(self.classes) // CLASS_RECORD_WORDS
+
+        for class_name, class_structure in module_structure.items():
+            first_function = len(self.functions) // FUNCTION_RECORD_WORDS
+
+            for function_name, function_structure in class_structure["functions"].items():
+                self.functions.extend((
+                    string_id(function_name),
+                    parallel.encode_function_flags(function_structure),
+                    len(self.variables),
+                    len(function_structure["variables"]),
+                ))
+                self.variables.extend(string_id(variable) for variable in function_structure["variables"])
+
+            # The owning file is filled in once the file index is sorted
+            self.classes.extend((
+                0,
+                string_id(class_name),
+                class_structure["lineno"],
+                class_structure["col_offset"],
+                int(round((class_structure["cohesion"] or 0.0) * COHESION_SCALE)),
+                len(self.variables),
+                len(class_structure["variables"]),
+                first_function,
+                len(class_structure["functions"]),
+            ))
+            self.variables.extend(string_id(variable) for variable in class_structure["variables"])
+
+        self.modules.append((string_id(baseline.normalize_filename(filename)), first_class, len(module_structure)))
+
+    def add_module(self, filename, file_module):
+        self.add(filename, file_module.structure)
+
+    def write(self, fd):
+        # Sorting the string table by UTF-8 bytes makes string ids ordered
+        # like the strings, so both can be binary searched
+        strings = sorted(self.strings, key=lambda string: string.encode("utf-8"))
+        encoded_strings = [string.encode("utf-8") for string in strings]
+        new_ids = array.array("I", bytes(4 * len(strings)))
+        for new_id, string in enumerate(strings):
+            new_ids[self.strings[string]] = new_id
+
+        string_offsets = array.array("I", [0])
+        for encoded_string in encoded_strings:
+            string_offsets.append(string_offsets[-1] + len(encoded_string))
+
+        functions = array.array("I", self.functions)
+        variables = array.array("I", (new_ids[string_id] for string_id in self.variables))
+
+        # Class records are laid out in filename order, so the output does
+        # not depend on the order files were added in
+        file_index = array.array("I")
+        classes = array.array("I")
+        modules = sorted(
+            (new_ids[filename_id], first_class, class_count)
+            for filename_id, first_class, class_count in self.modules
+        )
+        for file_position, (filename_id, first_class, class_count) in enumerate(modules):
+            file_index.extend((filename_id, len(classes) // CLASS_RECORD_WORDS, class_count))
+            for class_index in range(first_class, first_class + class_count):
+                offset = class_index * CLASS_RECORD_WORDS
+                classes.append(file_position)
+                classes.append(new_ids[self.classes[offset + 1]])
+                classes.extend(self.classes[offset + 2:offset + CLASS_RECORD_WORDS])
+
+        for offset in range(0, len(functions), FUNCTION_RECORD_WORDS):
+            functions[offset] = new_ids[functions[offset]]
+
+        fd.write(HEADER.pack(
+            STORE_MAGIC,
+            STORE_VERSION,
+            0,
+            len(strings),
+            len(modules),
+            len(classes) // CLASS_RECORD_WORDS,
+            len(functions) // FUNCTION_RECORD_WORDS,
+            len(variables),
+            string_offsets[-1],
+        ))
+        for words in (string_offsets, file_index, classes, functions, variables):
+            if sys.byteorder != "little":
+                words.byteswap()
+            words.tofile(fd)
+        fd.write(b"".join(encoded_strings))
+
+    def to_file(self, filename):
+        with open(filename, "wb") as fd:
+            self.write(fd)
+
+
+class Store(object):
+    """
+    Read a binary result file in place, e.g. from a memory map, decoding
+    only the records that a query touches
+    """
+
+    def __init__(self, buffer):
+        if len(buffer) < HEADER.size:
+            raise ValueError("truncated cohesion result file")
+
+        (
+            magic,
+            version,
+            _,
+            self.string_count,
+            self.file_count,
+            self.class_count,
+            self.function_count,
+            variable_count,
+            string_data_size,
+        ) = HEADER.unpack_from(buffer)
+
+        if magic != STORE_MAGIC:
+            raise ValueError("not a cohesion result file")
+        if version != STORE_VERSION:
+            raise ValueError("unsupported cohesion result file version {}".format(version))
+
+        word_count = (
+            self.string_count + 1
+            + self.file_count * FILE_RECORD_WORDS
+            + self.class_count * CLASS_RECORD_WORDS
+            + self.function_count * FUNCTION_RECORD_WORDS
+            + variable_count
+        )
+        if len(buffer) != HEADER.size + word_count * 4 + string_data_size:
+            raise ValueError("truncated cohesion result file")
+
+        self.view = memoryview(buffer)
+        word_bytes = self.view[HEADER.size:HEADER.size + word_count * 4]
+        if sys.byteorder == "little":
+            self.words = word_bytes.cast("I")
+        else:
+            self.words = array.array("I", word_bytes.tobytes())
+            self.words.byteswap()
+        self.string_data = self.view[HEADER.size + word_count * 4:]
+
+        self.file_offset = self.string_count + 1
+        self.class_offset = self.file_offset + self.file_count * FILE_RECORD_WORDS
+        self.function_offset = self.class_offset + self.class_count * CLASS_RECORD_WORDS
+        self.variable_offset = self.function_offset + self.function_count * FUNCTION_RECORD_WORDS
+
+        self.mmap = None
+
+    @classmethod
+    def from_file(cls, filename):
+        with open(filename, "rb") as fd:
+            buffer = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            result = cls(buffer)
+        except ValueError:
+            buffer.close()
+            raise
+
+        result.mmap = buffer
+        return result
+
+    def close(self):
+        if isinstance(self.words, memoryview):
+            self.words.release()
+        self.string_data.release()
+        self.view.release()
+        if self.mmap is not None:
+            self.mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_string_bytes(self, string_id):
+        return self.string_data[self.words[string_id]:self.words[string_id + 1]].tobytes()
+
+    def get_string(self, string_id):
+        return self.get_string_bytes(string_id).decode("utf-8")
+
+    def find_string(self, string):
+        """
+        Return the id of a string, or None if the file does not contain it
+        """
+        encoded_string = string.encode("utf-8")
+        low, high = 0, self.string_count
+
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_string_bytes(middle) < encoded_string:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low < self.string_count and self.get_string_bytes(low) == encoded_string:
+            return low
+
+        return None
+
+    def get_file_record(self, file_position):
+        offset = self.file_offset + file_position * FILE_RECORD_WORDS
+        return self.words[offset], self.words[offset + 1], self.words[offset + 2]
+
+    def get_variables(self, first_variable, variable_count):
+        offset = self.variable_offset + first_variable
+        return [
+            self.get_string(self.words[index])
+            for index in range(offset, offset + variable_count)
+        ]
+
+    def get_class(self, class_index):
+        """
+        Return the (file position, class name, class structure) of a class
+        """
+        offset = self.class_offset + class_index * CLASS_RECORD_WORDS
+        (
+            file_position,
+            name_id,
+            lineno,
+            col_offset,
+            cohesion,
+            first_variable,
+            variable_count,
+            first_function,
+            function_count,
+        ) = self.words[offset:offset + CLASS_RECORD_WORDS]
+
+        functions = {}
+        for function_index in range(first_function, first_function + function_count):
+            function_offset = self.function_offset + function_index * FUNCTION_RECORD_WORDS
+            function_name_id, flags, function_first_variable, function_variable_count = (
+                self.words[function_offset:function_offset + FUNCTION_RECORD_WORDS]
+            )
+            function_structure = {
+                "variables": self.get_variables(function_first_variable, function_variable_count),
+            }
+            function_structure.update(parallel.decode_function_flags(flags))
+            functions[self.get_string(function_name_id)] = function_structure
+
+        class_structure = {
+            "cohesion": cohesion / COHESION_SCALE,
+            "lineno": lineno,
+            "col_offset": col_offset,
+            "variables": self.get_variables(first_variable, variable_count),
+            "functions": functions,
+        }
+
+        return file_position, self.get_string(name_id), class_structure
+
+    def get_module_structure(self, file_position):
+        _, first_class, class_count = self.get_file_record(file_position)
+
+        module_structure = {}
+        for class_index in range(first_class, first_class + class_count):
+            _, class_name, class_structure = self.get_class(class_index)
+            module_structure[class_name] = class_structure
+
+        return module_structure
+
+    def find_file(self, filename):
+        """
+        Return the class structures of a file, or None if the file does not
+        contain it. Filenames are stored normalized, e.g. without a leading
+        "./"
+        """
+        filename_id = self.find_string(baseline.normalize_filename(filename))
+        if filename_id is None:
+            return None
+
+        # The file index is sorted by filename id
+        low, high = 0, self.file_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.get_file_record(middle)[0] < filename_id:
+                low = middle + 1
+            else:
+                high = middle
+
+        if low == self.file_count or self.get_file_record(low)[0] != filename_id:
+            return None
+
+        return self.get_module_structure(low)
+
+    def find_class(self, class_name):
+        """
+        Yield (filename, class structure) pairs of the classes with a
+        qualified name
+        """
+        name_id = self.find_string(class_name)
+        if name_id is None:
+            return
+
+        # Only the name column is scanned, and it is copied so that no view
+        # outlives a suspended generator
+        name_ids = self.words[self.class_offset + 1:self.function_offset:CLASS_RECORD_WORDS].tolist()
+        class_indexes = [
+            class_index
+            for class_index, class_name_id in enumerate(name_ids)
+            if class_name_id == name_id
+        ]
+        del name_ids
+
+        for class_index in class_indexes:
+            file_position, _, class_structure = self.get_class(class_index)
+            yield self.get_string(self.get_file_record(file_position)[0]), class_structure
+
+    def iter_records(self):
+        """
+        Yield (filename, module_structure) pairs sorted by filename
+        """
+        for file_position in range(self.file_count):
+            yield (
+                self.get_string(self.get_file_record(file_position)[0]),
+                self.get_module_structure(file_position),
+            )
@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+from . import filesystem
+
+logger = logging.getLogger(__name__)
+
+DEBOUNCE_SECONDS = 0.2
+POLL_INTERVAL_SECONDS = 1.0
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# Watch descriptor, mask, cookie and name length
+INOTIFY_EVENT = struct.Struct("iIII")
+INOTIFY_BUFFER_SIZE = 64 * 1024
+
+
+def get_python_file_states(directory):
+    """
+    Return the modification time and size of each Python file in a directory
+    """
+    result = {}
+
+    for filename in filesystem.recursively_get_python_files_from_directory(directory):
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            continue
+        result[filename] = (stat.st_mtime_ns, stat.st_size)
+
+    return result
+
+
+class PollingWatcher(object):
+    """
+    Detect changed Python files by periodically comparing their modification
+    times and sizes
+    """
+
+    def __init__(self, directory, interval=POLL_INTERVAL_SECONDS):
+        self.directory = directory
+        self.interval = interval
+        self.states = get_python_file_states(directory)
+
+    def read_changes(self, timeout=None):
+        """
+        Return the Python files that changed, were created or were removed,
+        waiting up to timeout seconds or until a change if timeout is None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            states = get_python_file_states(self.directory)
+            changes = {
+                filename
+                for filename in set(states) | set(self.states)
+                if states.get(filename) != self.states.get(filename)
+            }
+            self.states = states
+
+            if changes:
+                return changes
+
+            if deadline is None:
+                time.sleep(self.interval)
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return changes
+                time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher(object):
+    """
+    Detect changed Python files with Linux inotify, called through ctypes
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.libc = load_libc()
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.directories = {}
+        try:
+            for root, _, _ in os.walk(directory):
+                self.add_directory(root)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def add_directory(self, directory):
+        """
+        Watch a directory, raising OSError if it cannot be watched, e.g. once
+        the inotify watch limit is reached
+        """
+        watch_descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if watch_descriptor < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, "cannot watch {}: {}".format(directory, os.strerror(errno)))
+
+        self.directories[watch_descriptor] = directory
+
+    def read_changes(self, timeout=None):
+        """
+        Return the Python files that changed, were created or were removed,
+        waiting up to timeout seconds or until a change if timeout is None
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        buffer = os.read(self.fd, INOTIFY_BUFFER_SIZE)
+        changes = set()
+        offset = 0
+
+        while offset < len(buffer):
+            watch_descriptor, mask, _, name_length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(buffer[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so everything may have changed
+                changes.update(filesystem.recursively_get_python_files_from_directory(self.directory))
+                continue
+
+            directory = self.directories.get(watch_descriptor)
+            if directory is None or not name:
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    for root, _, _ in os.walk(path):
+                        try:
+                            self.add_directory(root)
+                        except OSError as e:
+                            logger.warning("Changes below %s will be missed: %s", root, e)
+                    changes.update(filesystem.recursively_get_python_files_from_directory(path))
+            elif filesystem.is_python_file(path):
+                changes.add(path)
+
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+
+def load_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+def get_watcher(directory):
+    """
+    Return an inotify watcher on Linux, falling back to polling where inotify
+    is unavailable
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except OSError as e:
+            logger.warning("Falling back to polling for changes: %s", e)
+        except AttributeError:
+            pass
+
+    return PollingWatcher(directory)
+
+
+def iter_changes(watcher, debounce=DEBOUNCE_SECONDS):
+    """
+    Yield sets of changed Python files. A burst of changes, e.g. an editor
+    saving several files, is yielded together once no change has been seen
+    for debounce seconds
+    """
+    while True:
+        changes = watcher.read_changes()
+        if not changes:
+            continue
+
+        while True:
+            more_changes = watcher.read_changes(debounce)
+            if not more_changes:
+                break
+            changes |= more_changes
+
+        yield changes
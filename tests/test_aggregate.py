@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+
+import os
+import textwrap
+import unittest
+
+from cohesion import aggregate
+from cohesion import module
+
+
+class TestAggregate(unittest.TestCase):
+
+    def test_get_path_components(self):
+        result = aggregate.get_path_components(os.path.join(".", "directory", "filename.py"))
+        expected = ("directory", "filename.py")
+
+        self.assertEqual(result, expected)
+
+    def test_class_weight(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            variable1 = 'foo'
+            variable2 = 'bar'
+            def func1(self):
+                pass
+            def func2(self):
+                pass
+            def func3(self):
+                pass
+        """)
+
+        class_structure = module.Module.from_string(python_string).structure["Cls"]
+
+        result = [
+            aggregate.class_weight(class_structure, weight)
+            for weight in aggregate.WEIGHTS
+        ]
+        expected = [1, 3, 2]
+
+        self.assertEqual(result, expected)
+
+    def test_tree_aggregator_classes(self):
+        python_string1 = textwrap.dedent("""
+        class Cls1(object):
+            def func(self):
+                self.variable = 'foo'
+        class Cls2(object):
+            variable1 = 'foo'
+            def func(self):
+                self.variable2 = 'bar'
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls3(object):
+            variable = 'foo'
+            def func(self):
+                pass
+        """)
+
+        aggregator = aggregate.TreeAggregator()
+        aggregator.add("pkg/a.py", module.Module.from_string(python_string1).structure)
+        aggregator.add("pkg/sub/b.py", module.Module.from_string(python_string2).structure)
+
+        result = {
+            "/".join(components): node.cohesion()
+            for components, node in aggregator.items()
+        }
+        expected = {
+            "": 50.0,
+            "pkg": 50.0,
+            "pkg/a.py": 75.0,
+            "pkg/sub": 0.0,
+            "pkg/sub/b.py": 0.0,
+        }
+
+        self.assertEqual(result, expected)
+
+    def test_tree_aggregator_methods_weight(self):
+        python_string = textwrap.dedent("""
+        class Cls1(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                self.variable = 'bar'
+            def func3(self):
+                self.variable = 'baz'
+        class Cls2(object):
+            variable = 'foo'
+            def func(self):
+                pass
+        """)
+
+        aggregator = aggregate.TreeAggregator(aggregate.WEIGHT_METHODS)
+        aggregator.add("a.py", module.Module.from_string(python_string).structure)
+
+        result = aggregator.nodes[("a.py",)].cohesion()
+        expected = 75.0
+
+        self.assertEqual(result, expected)
+
+    def test_tree_aggregator_depth(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+
+        aggregator = aggregate.TreeAggregator(depth=1)
+        aggregator.add("pkg/sub/b.py", module.Module.from_string(python_string).structure)
+
+        result = [components for components, _ in aggregator.items()]
+        expected = [(), ("pkg",)]
+
+        self.assertEqual(result, expected)
+
+    def test_tree_aggregator_negative_depth(self):
+        with self.assertRaises(ValueError):
+            aggregate.TreeAggregator(depth=-1)
+
+    def test_tree_aggregator_kinds(self):
+        aggregator = aggregate.TreeAggregator()
+        aggregator.add("pkg/__init__.py", {})
+        aggregator.add("scripts/run.py", {})
+
+        result = {
+            "/".join(components): node.kind()
+            for components, node in aggregator.items()
+        }
+        expected = {
+            "": "Directory",
+            "pkg": "Package",
+            "pkg/__init__.py": "Module",
+            "scripts": "Directory",
+            "scripts/run.py": "Module",
+        }
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import subprocess
+import tempfile
+import textwrap
+import unittest
+
+from cohesion import backfill
+from cohesion import history
+
+
+class TestBackfill(unittest.TestCase):
+
+    def test_parse_tree_entries(self):
+        output = (
+            "100644 blob 1111111111111111111111111111111111111111\tdirectory/file.py\0"
+            "100644 blob 2222222222222222222222222222222222222222\tREADME.md\0"
+            "160000 commit 3333333333333333333333333333333333333333\tsubmodule.py\0"
+            "100644 blob 4444444444444444444444444444444444444444\tname with\ttab.py\0"
+        )
+
+        result = backfill.parse_tree_entries(output)
+        expected = [
+            ("directory/file.py", "1111111111111111111111111111111111111111"),
+            ("name with\ttab.py", "4444444444444444444444444444444444444444"),
+        ]
+
+        self.assertEqual(result, expected)
+
+
+@unittest.skipUnless(shutil.which("git"), "git is not installed")
+class TestBackfillRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.git("init", "--quiet")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def git(self, *arguments):
+        subprocess.check_call(
+            [
+                "git",
+                "-c", "user.name=test",
+                "-c", "user.email=test@example.com",
+                "-c", "commit.gpgsign=false",
+            ] + list(arguments),
+            cwd=self.directory,
+            stdout=subprocess.DEVNULL
+        )
+
+    def commit_file(self, filename, contents, timestamp):
+        with open(os.path.join(self.directory, filename), "w") as fd:
+            fd.write(textwrap.dedent(contents))
+        self.git("add", filename)
+        date = "{} +0000".format(timestamp)
+        os.environ["GIT_COMMITTER_DATE"] = date
+        try:
+            self.git("commit", "--quiet", "--date", date, "-m", filename)
+        finally:
+            del os.environ["GIT_COMMITTER_DATE"]
+
+    def test_backfill_reuses_unchanged_blobs(self):
+        self.commit_file("a.py", """
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                self.variable = 'bar'
+        """, 1000000000)
+        self.commit_file("b.py", """
+        class Other(object):
+            pass
+        """, 1000000001)
+        self.commit_file("a.py", """
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                pass
+        """, 1000000002)
+
+        run_history = history.History(":memory:")
+        try:
+            result = [
+                (file_count, analyzed_count)
+                for _, file_count, analyzed_count in backfill.backfill(
+                    run_history,
+                    directory=self.directory
+                )
+            ]
+            regressions = [
+                regression
+                for _, _, run_regressions in run_history.trend(3)
+                for regression in run_regressions
+            ]
+        finally:
+            run_history.close()
+
+        expected = [(1, 1), (2, 1), (2, 1)]
+
+        self.assertEqual(result, expected)
+        self.assertEqual(regressions, [("a.py", "Cls", 100.0, 50.0)])
+
+    def test_backfill_same_timestamp(self):
+        self.commit_file("a.py", """
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                self.variable = 'bar'
+        """, 1000000000)
+        self.commit_file("a.py", """
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                pass
+        """, 1000000000)
+
+        run_history = history.History(":memory:")
+        try:
+            list(backfill.backfill(run_history, directory=self.directory))
+            regressions = [
+                regression
+                for _, _, run_regressions in run_history.trend(2)
+                for regression in run_regressions
+            ]
+        finally:
+            run_history.close()
+
+        self.assertEqual(regressions, [("a.py", "Cls", 100.0, 50.0)])
+
+    def test_analyze_blob_missing_object(self):
+        self.commit_file("a.py", """
+        class Cls(object):
+            pass
+        """, 1000000000)
+        _, blob_hash = backfill.get_tree_python_blobs("HEAD", self.directory)[0]
+
+        with backfill.BlobReader(self.directory) as reader:
+            missing = backfill.analyze_blob(reader, "missing.py", "0" * 40)
+            result = backfill.analyze_blob(reader, "a.py", blob_hash)
+
+        self.assertIsNone(missing)
+        self.assertEqual(list(result), ["Cls"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+
+import os
+import textwrap
+import unittest
+
+from cohesion import baseline
+from cohesion import module
+
+from pyfakefs import fake_filesystem_unittest
+
+
+class TestBaseline(unittest.TestCase):
+
+    def assertEmpty(self, iterable):
+        self.assertEqual(len(iterable), 0)
+
+    def test_class_fingerprint_ignores_location(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+        python_string2 = textwrap.dedent("""
+        x = 5
+
+        class Other(object):
+            def func(self):
+                self.variable = 'bar'
+        """)
+
+        module1 = module.Module.from_string(python_string1)
+        module2 = module.Module.from_string(python_string2)
+
+        result = baseline.class_fingerprint(module1.structure["Cls"])
+        expected = baseline.class_fingerprint(module2.structure["Other"])
+
+        self.assertEqual(result, expected)
+
+    def test_class_fingerprint_structure_change(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.variable = 'foo'
+            def other(self):
+                pass
+        """)
+
+        module1 = module.Module.from_string(python_string1)
+        module2 = module.Module.from_string(python_string2)
+
+        result = baseline.class_fingerprint(module1.structure["Cls"])
+        expected = baseline.class_fingerprint(module2.structure["Cls"])
+
+        self.assertNotEqual(result, expected)
+
+    def test_filter_baseline_unchanged(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            class_variable = 'foo'
+            def func(self):
+                self.instance_variable = 'bar'
+        """)
+
+        previous_baseline = baseline.Baseline()
+        previous_baseline.add_module("file.py", module.Module.from_string(python_string))
+
+        python_module = module.Module.from_string(python_string)
+        python_module.filter_baseline(previous_baseline, "file.py")
+
+        result = python_module.classes()
+
+        self.assertEmpty(result)
+
+    def test_filter_baseline_new_class(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            pass
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls(object):
+            pass
+        class New(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+
+        previous_baseline = baseline.Baseline()
+        previous_baseline.add_module("file.py", module.Module.from_string(python_string1))
+
+        python_module = module.Module.from_string(python_string2)
+        python_module.filter_baseline(previous_baseline, "file.py")
+
+        result = python_module.classes()
+        expected = ["New"]
+
+        self.assertEqual(result, expected)
+
+    def test_filter_baseline_regressed(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                self.variable = 'bar'
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                pass
+        """)
+
+        previous_baseline = baseline.Baseline()
+        previous_baseline.add_module("file.py", module.Module.from_string(python_string1))
+
+        python_module = module.Module.from_string(python_string2)
+        python_module.filter_baseline(previous_baseline, "file.py")
+
+        result = python_module.classes()
+        expected = ["Cls"]
+
+        self.assertEqual(result, expected)
+
+    def test_filter_baseline_renamed_class(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+        python_string2 = textwrap.dedent("""
+        class Renamed(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+
+        previous_baseline = baseline.Baseline()
+        previous_baseline.add_module("file.py", module.Module.from_string(python_string1))
+
+        python_module = module.Module.from_string(python_string2)
+        python_module.filter_baseline(previous_baseline, "file.py")
+
+        result = python_module.classes()
+
+        self.assertEmpty(result)
+
+    def test_filter_baseline_copied_class_other_file(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+
+        previous_baseline = baseline.Baseline()
+        previous_baseline.add_module("file.py", module.Module.from_string(python_string))
+
+        python_module = module.Module.from_string(python_string.replace("Cls", "Copy"))
+        python_module.filter_baseline(previous_baseline, "other.py")
+
+        result = python_module.classes()
+        expected = ["Copy"]
+
+        self.assertEqual(result, expected)
+
+    def test_filter_baseline_copied_class_same_file(self):
+        python_string1 = textwrap.dedent("""
+        class Cls1(object):
+            def func(self):
+                self.variable = 'foo'
+        class Cls2(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls1(object):
+            def func(self):
+                self.variable = 'foo'
+        class Renamed(object):
+            def func(self):
+                self.variable = 'foo'
+        class Copy(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+
+        previous_baseline = baseline.Baseline()
+        previous_baseline.add_module("file.py", module.Module.from_string(python_string1))
+
+        python_module = module.Module.from_string(python_string2)
+        python_module.filter_baseline(previous_baseline, "file.py")
+
+        result = python_module.classes()
+        expected = ["Copy"]
+
+        self.assertEqual(result, expected)
+
+
+class TestBaselineFile(fake_filesystem_unittest.TestCase):
+
+    def setUp(self):
+        self.setUpPyfakefs()
+
+    def test_baseline_missing_file(self):
+        result = baseline.Baseline.from_file("missing.json")
+
+        self.assertEqual(len(result), 0)
+
+    def test_baseline_round_trip(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            class_variable = 'foo'
+            def func(self):
+                self.instance_variable = 'bar'
+        """)
+
+        filename = os.path.join("directory", "baseline.json")
+        self.fs.create_dir("directory")
+
+        previous_baseline = baseline.Baseline()
+        previous_baseline.add_module(
+            os.path.join("directory", "file.py"),
+            module.Module.from_string(python_string)
+        )
+        previous_baseline.to_file(filename)
+
+        result = baseline.Baseline.from_file(filename).entries()
+        expected = previous_baseline.entries()
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+import textwrap
+import unittest
+
+from cohesion import cluster
+from cohesion import module
+
+
+class TestCluster(unittest.TestCase):
+
+    def test_union_find_groups(self):
+        components = cluster.UnionFind()
+        for item in range(5):
+            components.add(item)
+        components.union(0, 1)
+        components.union(3, 4)
+        components.union(1, 4)
+
+        result = sorted(sorted(group) for group in components.groups())
+        expected = [[0, 1, 3, 4], [2]]
+
+        self.assertEqual(result, expected)
+
+    def test_get_class_clusters_single(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func1(self):
+                self.variable1 = 'foo'
+            def func2(self):
+                self.variable1 = self.variable2
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.class_clusters("Cls")
+        expected = [(["func1", "func2"], ["variable1", "variable2"])]
+
+        self.assertEqual(result, expected)
+
+    def test_get_class_clusters_split(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            unused = 5
+            def __init__(self):
+                self.variable1 = 'foo'
+                self.variable2 = 'bar'
+            def func1(self):
+                return self.variable1
+            def func2(self):
+                return self.variable1
+            def func3(self):
+                return self.variable2
+            @staticmethod
+            def func4():
+                pass
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.class_clusters("Cls")
+        expected = [
+            (["func1", "func2"], ["variable1"]),
+            (["func3"], ["variable2"]),
+            ([], ["unused"]),
+        ]
+
+        self.assertEqual(result, expected)
+
+    def test_get_class_split_clusters_cohesive(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def __init__(self):
+                self.a = 'foo'
+            def f(self):
+                return self.a
+            def g(self):
+                self.a = 'bar'
+            @staticmethod
+            def helper():
+                pass
+            def __repr__(self):
+                return 'Cls()'
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = cluster.get_class_split_clusters(python_module.structure["Cls"])
+
+        self.assertEqual(result, [])
+
+    def test_get_class_split_clusters(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            unused = 5
+            def func1(self):
+                return self.variable1
+            def func2(self):
+                return self.variable2
+            def __repr__(self):
+                return 'Cls()'
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = cluster.get_class_split_clusters(python_module.structure["Cls"])
+        expected = [
+            (["func1"], ["variable1"]),
+            (["func2"], ["variable2"]),
+        ]
+
+        self.assertEqual(result, expected)
+
+    def test_get_class_clusters_constructor_included(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def __init__(self):
+                self.variable1 = 'foo'
+                self.variable2 = 'bar'
+            def func1(self):
+                return self.variable1
+            def func2(self):
+                return self.variable2
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = cluster.get_class_clusters(
+            python_module.structure["Cls"],
+            ignored_functions=()
+        )
+        expected = [(["__init__", "func1", "func2"], ["variable1", "variable2"])]
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+
+import os
+import textwrap
+import unittest
+
+from cohesion import config
+
+from pyfakefs import fake_filesystem_unittest
+
+
+class TestConfig(unittest.TestCase):
+
+    def setUp(self):
+        self.root = os.path.abspath("project")
+
+    def path(self, *components):
+        return os.path.join(self.root, *components)
+
+    def test_settings_defaults(self):
+        run_config = config.Config.from_dict({}, self.root)
+
+        settings = run_config.settings(self.path("module.py"))
+
+        self.assertIsNone(settings.below)
+        self.assertIsNone(settings.above)
+        self.assertFalse(settings.exclude)
+        self.assertFalse(settings.is_class_ignored("Cls"))
+
+    def test_settings_override(self):
+        run_config = config.Config.from_dict({
+            "below": 50,
+            "overrides": [
+                {"paths": ["tests/*"], "above": 20, "ignore-classes": ["Test*"]},
+            ],
+        }, self.root)
+
+        settings = run_config.settings(self.path("tests", "test_module.py"))
+
+        self.assertIsNone(settings.below)
+        self.assertEqual(settings.above, 20.0)
+        self.assertTrue(settings.is_class_ignored("TestModule"))
+        self.assertFalse(settings.is_class_ignored("Helper"))
+
+    def test_settings_later_override_wins(self):
+        run_config = config.Config.from_dict({
+            "overrides": [
+                {"paths": ["src/*"], "below": 50},
+                {"paths": ["src/legacy/*"], "below": 10},
+            ],
+        }, self.root)
+
+        result = [
+            run_config.settings(self.path("src", "module.py")).below,
+            run_config.settings(self.path("src", "legacy", "module.py")).below,
+            run_config.settings(self.path("other.py")).below,
+        ]
+        expected = [50.0, 10.0, None]
+
+        self.assertEqual(result, expected)
+
+    def test_settings_shared(self):
+        run_config = config.Config.from_dict({
+            "overrides": [{"paths": ["tests/*"], "below": 10}],
+        }, self.root)
+
+        result = run_config.settings(self.path("tests", "test_one.py"))
+        expected = run_config.settings(self.path("tests", "test_two.py"))
+
+        self.assertIs(result, expected)
+
+    def test_is_excluded(self):
+        run_config = config.Config.from_dict({"exclude": ["build/*", "*_pb2.py"]}, self.root)
+
+        result = [
+            run_config.is_excluded(self.path("build", "lib", "module.py")),
+            run_config.is_excluded(self.path("src", "service_pb2.py")),
+            run_config.is_excluded(self.path("src", "module.py")),
+        ]
+        expected = [True, True, False]
+
+        self.assertEqual(result, expected)
+
+    def test_unknown_option(self):
+        with self.assertRaises(config.ConfigError):
+            config.Config.from_dict({"metric": "lcom4"}, self.root)
+
+    def test_invalid_threshold(self):
+        with self.assertRaises(config.ConfigError):
+            config.Config.from_dict({"below": 150}, self.root)
+
+    def test_override_requires_paths(self):
+        with self.assertRaises(config.ConfigError):
+            config.Config.from_dict({"overrides": [{"below": 10}]}, self.root)
+
+
+@unittest.skipIf(config.tomllib is None, "requires Python 3.11 or tomli")
+class TestConfigFile(fake_filesystem_unittest.TestCase):
+
+    def setUp(self):
+        self.setUpPyfakefs()
+
+    def test_find_nearest(self):
+        self.fs.create_file(os.path.join("project", "pyproject.toml"), contents=textwrap.dedent("""
+        [tool.cohesion]
+        below = 40
+        """))
+        self.fs.create_file(os.path.join("project", "src", "pyproject.toml"), contents=textwrap.dedent("""
+        [tool.other]
+        key = "value"
+        """))
+
+        run_config = config.Config.find(os.path.join("project", "src"))
+
+        self.assertEqual(run_config.root, os.path.abspath("project"))
+        self.assertEqual(run_config.options["below"], 40.0)
+
+    def test_find_missing(self):
+        self.fs.create_dir("project")
+
+        result = config.Config.find("project")
+
+        self.assertIsNone(result)
+
+
+if __name__ == "__main__":
+    unittest.main()
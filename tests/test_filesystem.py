@@ -1,8 +1,10 @@
 #!/usr/bin/env python
 
+import io
 import os
 import textwrap
 import unittest
+from unittest import mock
 
 from cohesion import filesystem
 
@@ -34,6 +36,18 @@ class TestFilesystem(fake_filesystem_unittest.TestCase):
 
         self.assertEqual(result, contents)
 
+    def test_get_file_size(self):
+        filename = os.path.join("directory", "filename.py")
+
+        self.fs.create_file(
+            filename,
+            contents="a = 5\n"
+        )
+        result = filesystem.get_file_size(filename)
+        expected = 6
+
+        self.assertEqual(result, expected)
+
     def test_recursively_get_files_from_directory(self):
         filenames = [
             os.path.join(".", "filename.txt"),
@@ -67,6 +81,41 @@ class TestFilesystem(fake_filesystem_unittest.TestCase):
 
         self.assertCountEqual(result, expected)
 
+    def test_get_module_name(self):
+        result = [
+            filesystem.get_module_name(os.path.join(".", "pkg", "module.py")),
+            filesystem.get_module_name(os.path.join("pkg", "sub", "__init__.py")),
+            filesystem.get_module_name("script.py"),
+        ]
+        expected = ["pkg.module", "pkg.sub", "script"]
+
+        self.assertEqual(result, expected)
+
+    def test_iter_paths_newline(self):
+        fd = io.StringIO("first.py\r\nsecond.py\n\nthird.py")
+
+        with mock.patch.object(filesystem, "PATH_LIST_CHUNK_SIZE", 4):
+            result = list(filesystem.iter_paths(fd))
+        expected = ["first.py", "second.py", "third.py"]
+
+        self.assertEqual(result, expected)
+
+    def test_iter_paths_nul(self):
+        fd = io.StringIO("first.py\0with\nnewline.py\0")
+
+        result = list(filesystem.iter_paths(fd))
+        expected = ["first.py", "with\nnewline.py"]
+
+        self.assertEqual(result, expected)
+
+    def test_get_python_files_from_list(self):
+        self.fs.create_file("files.txt", contents="upper.py\nREADME.md\nlower.py\n")
+
+        result = list(filesystem.get_python_files_from_list("files.txt"))
+        expected = ["upper.py", "lower.py"]
+
+        self.assertEqual(result, expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -85,6 +85,37 @@ class TestFlake8Extension(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_flake8_extension_ignore_pragma(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):  # cohesion: ignore
+            pass
+        """)
+
+        ast_node = parser.get_ast_node_from_string(python_string)
+        lines = python_string.splitlines(True)
+        checker = flake8_extension.CohesionChecker(ast_node, "unused", lines)
+        checker.cohesion_below = 0.0
+
+        result = list(checker.run())
+
+        self.assertEmpty(result)
+
+    def test_flake8_extension_skip_file_pragma(self):
+        python_string = textwrap.dedent("""
+        # cohesion: skip-file
+        class Cls(object):
+            pass
+        """)
+
+        ast_node = parser.get_ast_node_from_string(python_string)
+        lines = python_string.splitlines(True)
+        checker = flake8_extension.CohesionChecker(ast_node, "unused", lines)
+        checker.cohesion_below = 0.0
+
+        result = list(checker.run())
+
+        self.assertEmpty(result)
+
     def test_flake8_extension_bad_option_type(self):
         python_string = textwrap.dedent("""
         class Cls(object):
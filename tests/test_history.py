@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+import textwrap
+import unittest
+
+from cohesion import history
+from cohesion import module
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.history = history.History(":memory:")
+
+    def tearDown(self):
+        self.history.close()
+
+    def test_runs_chronological(self):
+        self.history.begin_run("newer", timestamp=20)
+        self.history.begin_run("older", timestamp=10)
+        self.history.commit()
+
+        result = [commit_hash for _, commit_hash, _ in self.history.runs()]
+        expected = ["older", "newer"]
+
+        self.assertEqual(result, expected)
+
+    def test_runs_limit(self):
+        for timestamp in range(5):
+            self.history.begin_run(str(timestamp), timestamp=timestamp)
+        self.history.commit()
+
+        result = [commit_hash for _, commit_hash, _ in self.history.runs(2)]
+        expected = ["3", "4"]
+
+        self.assertEqual(result, expected)
+
+    def test_regressions(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                self.variable = 'bar'
+        class Other(object):
+            pass
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                pass
+        class Other(object):
+            pass
+        """)
+
+        structure1 = module.Module.from_string(python_string1).structure
+        structure2 = module.Module.from_string(python_string2).structure
+
+        run_id1 = self.history.begin_run("commit1", timestamp=1)
+        self.history.add_module(run_id1, "file.py", structure1)
+        run_id2 = self.history.begin_run("commit2", timestamp=2)
+        self.history.add_module(run_id2, "file.py", structure2)
+        self.history.commit()
+
+        result = self.history.regressions(run_id1, run_id2)
+        expected = [("file.py", "Cls", 100.0, 50.0)]
+
+        self.assertEqual(result, expected)
+
+    def test_trend(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            pass
+        """)
+
+        structure = module.Module.from_string(python_string).structure
+
+        for timestamp in range(3):
+            run_id = self.history.begin_run(str(timestamp), timestamp=timestamp)
+            self.history.add_module(run_id, "file.py", structure)
+        self.history.commit()
+
+        result = [
+            (previous_run[1], current_run[1], regressions)
+            for previous_run, current_run, regressions in self.history.trend(3)
+        ]
+        expected = [("0", "1", []), ("1", "2", [])]
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,10 @@
 import os
 import textwrap
 import unittest
+from unittest import mock
 
 from cohesion import module
+from cohesion import parser
 
 from pyfakefs import fake_filesystem_unittest
 
@@ -63,6 +65,83 @@ class TestModule(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_module_async_function_variable(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            async def func(self):
+                self.function_variable = await self.other()
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.function_variables("Cls", "func")
+        expected = ["function_variable"]
+
+        self.assertEqual(result, expected)
+
+    def test_module_decorators_resolved_once(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func1(self):
+                self.variable = 'foo'
+            @property
+            def func2(self):
+                return self.variable
+        """)
+
+        with mock.patch.object(
+            parser,
+            "get_method_decorator_flags",
+            wraps=parser.get_method_decorator_flags
+        ) as get_method_decorator_flags:
+            module.Module.from_string(python_string)
+
+        result = [call.args[0].name for call in get_method_decorator_flags.call_args_list]
+        expected = ["func1", "func2"]
+
+        self.assertEqual(result, expected)
+
+    def test_module_nested_scopes_exclude(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func1(self):
+                self.variable1 = 'foo'
+                def inner():
+                    self.variable2 = 'bar'
+            def func2(self):
+                self.variable1 = 'baz'
+        """)
+
+        python_module = module.Module.from_string(
+            python_string,
+            nested_scopes=parser.NESTED_SCOPES_EXCLUDE
+        )
+
+        result = python_module.class_cohesion_percentage("Cls")
+        expected = 100
+
+        self.assertEqual(result, expected)
+
+    def test_module_overloads_skipped(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            @typing.overload
+            def func(self, arg: int) -> int:
+                ...
+            @typing.overload
+            def func(self, arg: str) -> str:
+                ...
+            def func(self, arg):
+                self.variable = arg
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.function_variables("Cls", "func")
+        expected = ["variable"]
+
+        self.assertEqual(result, expected)
+
     def test_module_class_variable(self):
         python_string = textwrap.dedent("""
         class Cls(object):
@@ -78,6 +157,43 @@ class TestModule(unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_module_dataclass_fields(self):
+        python_string = textwrap.dedent("""
+        @dataclasses.dataclass
+        class Cls(object):
+            field1: int
+            field2: int = 0
+            def func(self):
+                return self.field1 + self.field2
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.class_cohesion_percentage("Cls")
+        expected = 100
+
+        self.assertEqual(result, expected)
+
+    def test_module_property_is_variable(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            @property
+            def prop(self):
+                return 5
+            def func(self):
+                return self.prop
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = [
+            python_module.functions("Cls"),
+            python_module.class_variables("Cls"),
+        ]
+        expected = [["func"], ["prop"]]
+
+        self.assertEqual(result, expected)
+
     def test_module_function_variable(self):
         python_string = textwrap.dedent("""
         class Cls(object):
@@ -227,11 +343,188 @@ class TestModule(unittest.TestCase):
 
         python_module = module.Module.from_string(python_string)
 
-        result = python_module.structure["Cls"]["col_offset"]
+        result = python_module.structure["foo.<locals>.Cls"]["col_offset"]
         expected = 4
 
         self.assertEqual(result, expected)
 
+    def test_module_nested_class_qualified_name(self):
+        python_string = textwrap.dedent("""
+        class Outer(object):
+            class Inner(object):
+                pass
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.classes()
+        expected = ["Outer", "Outer.Inner"]
+
+        self.assertEqual(result, expected)
+
+    def test_module_nested_class_variables_not_shared(self):
+        python_string = textwrap.dedent("""
+        class Outer(object):
+            def func1(self):
+                self.a = 1
+            def func2(self):
+                self.a = 2
+                self.b = 3
+            class Meta(object):
+                def func(self):
+                    self.z = 4
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        self.assertCountEqual(python_module.class_variables("Outer"), ["a", "b"])
+        self.assertCountEqual(python_module.class_variables("Outer.Meta"), ["z"])
+        self.assertEqual(python_module.structure["Outer"]["cohesion"], 75.0)
+
+    def test_module_same_named_classes_do_not_collide(self):
+        python_string = textwrap.dedent("""
+        class Model1(object):
+            class Meta(object):
+                ordering = 'name'
+        class Model2(object):
+            class Meta(object):
+                abstract = True
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = [
+            python_module.class_variables("Model1.Meta"),
+            python_module.class_variables("Model2.Meta"),
+        ]
+        expected = [["ordering"], ["abstract"]]
+
+        self.assertEqual(result, expected)
+
+    def test_module_redefined_class_keeps_last(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            pass
+        class Cls(object):
+            pass
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.structure["Cls"]["lineno"]
+        expected = 4
+
+        self.assertEqual(result, expected)
+
+    def test_module_low_memory_same_structure(self):
+        python_string = textwrap.dedent("""
+        class Outer(object):
+            class_variable = 'foo'
+            def func(self):
+                self.instance_variable = 'bar'
+            class Inner(object):
+                def func(self):
+                    self.inner_variable = 'baz'
+        """)
+
+        result = module.Module.from_string(python_string, low_memory=True).structure
+        expected = module.Module.from_string(python_string).structure
+
+        self.assertEqual(result, expected)
+
+    def test_module_max_classes_exceeded(self):
+        python_string = textwrap.dedent("""
+        class Cls1(object):
+            pass
+        class Cls2(object):
+            pass
+        """)
+
+        with self.assertRaises(module.ModuleTooLarge):
+            module.Module.from_string(python_string, max_classes=1)
+
+    def test_module_max_classes_not_exceeded(self):
+        python_string = textwrap.dedent("""
+        class Cls1(object):
+            pass
+        class Cls2(object):
+            pass
+        """)
+
+        python_module = module.Module.from_string(python_string, max_classes=2)
+
+        result = python_module.classes()
+        expected = ["Cls1", "Cls2"]
+
+        self.assertEqual(result, expected)
+
+    def test_module_class_filter(self):
+        python_string = textwrap.dedent("""
+        class Cls1(object):
+            class Inner(object):
+                pass
+        class Cls2(object):
+            pass
+        """)
+
+        python_module = module.Module.from_string(
+            python_string,
+            class_filter=lambda class_name: class_name.startswith("Cls1")
+        )
+
+        result = python_module.classes()
+        expected = ["Cls1", "Cls1.Inner"]
+
+        self.assertEqual(result, expected)
+
+    def test_module_prefilter_classless(self):
+        python_string = textwrap.dedent("""
+        def func(
+        """)
+
+        python_module = module.Module.from_string(python_string, prefilter=True)
+
+        self.assertEmpty(python_module.classes())
+
+    def test_module_prefilter_class(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            pass
+        """)
+
+        python_module = module.Module.from_string(python_string, prefilter=True)
+
+        result = python_module.classes()
+        expected = ["Cls"]
+
+        self.assertEqual(result, expected)
+
+    def test_module_ignore_pragma(self):
+        python_string = textwrap.dedent("""
+        @decorator
+        class Cls1(object):  # cohesion: ignore
+            pass
+        class Cls2(object):
+            pass
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = python_module.classes()
+        expected = ["Cls2"]
+
+        self.assertEqual(result, expected)
+
+    def test_module_skip_file_pragma(self):
+        python_string = textwrap.dedent("""
+        # cohesion: skip-file
+        class Cls(object):
+            pass
+        """)
+
+        with self.assertRaises(module.ModuleSkipped):
+            module.Module.from_string(python_string)
+
 
 class TestModuleFile(fake_filesystem_unittest.TestCase):
 
@@ -261,6 +554,42 @@ class TestModuleFile(fake_filesystem_unittest.TestCase):
 
         self.assertEqual(result, expected)
 
+    def test_module_from_file_max_file_size(self):
+        filename = os.path.join("directory", "filename.py")
+
+        contents = textwrap.dedent("""
+        class Cls(object):
+            pass
+        """)
+
+        self.fs.create_file(
+            filename,
+            contents=contents
+        )
+
+        with self.assertRaises(module.ModuleTooLarge):
+            module.Module.from_file(filename, max_file_size=len(contents) - 1)
+
+    def test_module_from_file_prefilter_coding(self):
+        filename = os.path.join("directory", "filename.py")
+
+        contents = textwrap.dedent("""
+        # -*- coding: latin-1 -*-
+        class Cls(object):
+            name = 'caf\xe9'
+        """).encode("latin-1")
+
+        self.fs.create_file(
+            filename,
+            contents=contents
+        )
+        file_module = module.Module.from_file(filename, prefilter=True)
+
+        result = file_module.classes()
+        expected = ["Cls"]
+
+        self.assertEqual(result, expected)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+
+import io
+import os
+import shutil
+import tempfile
+import textwrap
+import time
+import unittest
+from multiprocessing.pool import ThreadPool
+
+from cohesion import module
+from cohesion import parallel
+
+
+class TestParallel(unittest.TestCase):
+
+    def test_read_results_round_trip(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            variable = 'foo'
+            def func1(self):
+                self.variable = 'bar'
+            @staticmethod
+            def func2():
+                pass
+        class Empty(object):
+            pass
+        """)
+        structure = module.Module.from_string(python_string).structure
+
+        writer = parallel.ResultWriter()
+        writer.add_module("first.py", structure)
+        writer.add_skipped("second.py", parallel.FILE_TOO_LARGE, "too large")
+        fd = io.BytesIO()
+        writer.write(fd)
+
+        results = parallel.read_results(fd.getvalue())
+
+        self.assertEqual([filename for filename, _ in results], ["first.py", "second.py"])
+        self.assertEqual(results[0][1].structure, structure)
+        self.assertIsInstance(results[1][1], module.ModuleTooLarge)
+        self.assertEqual(str(results[1][1]), "too large")
+
+    def test_read_results_invalid(self):
+        writer = parallel.ResultWriter()
+        writer.add_skipped("invalid.py", parallel.FILE_INVALID, "invalid syntax")
+        fd = io.BytesIO()
+        writer.write(fd)
+
+        results = parallel.read_results(fd.getvalue())
+
+        self.assertIsInstance(results[0][1], SyntaxError)
+        self.assertEqual(str(results[0][1]), "invalid syntax")
+
+    def test_function_flags_round_trip(self):
+        for bounded, staticmethod, classmethod in [(True, False, False), (False, True, False), (True, False, True)]:
+            function_structure = {
+                "bounded": bounded,
+                "staticmethod": staticmethod,
+                "classmethod": classmethod,
+            }
+
+            result = parallel.decode_function_flags(parallel.encode_function_flags(function_structure))
+
+            self.assertEqual(result, function_structure)
+
+    def test_get_chunks(self):
+        result = list(parallel.get_chunks(range(5), 2))
+        expected = [[0, 1], [2, 3], [4]]
+
+        self.assertEqual(result, expected)
+
+
+def delayed_identity(value):
+    time.sleep(value / 100.0)
+    return value
+
+
+def fail(value):
+    raise ValueError(value)
+
+
+class TestReorderBuffer(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = ThreadPool(3)
+
+    def tearDown(self):
+        self.pool.terminate()
+
+    def test_ordered(self):
+        reorder_buffer = parallel.ReorderBuffer(self.pool, delayed_identity, [3, 1, 2, 0], window=2)
+
+        result = list(reorder_buffer)
+        expected = [3, 1, 2, 0]
+
+        self.assertEqual(result, expected)
+
+    def test_unordered(self):
+        reorder_buffer = parallel.ReorderBuffer(self.pool, delayed_identity, [30, 0, 10], window=3, ordered=False)
+
+        result = list(reorder_buffer)
+        expected = [0, 10, 30]
+
+        self.assertEqual(result, expected)
+
+    def test_window_bounds_in_flight(self):
+        in_flight = []
+        reorder_buffer = parallel.ReorderBuffer(self.pool, delayed_identity, range(10), window=2)
+
+        for _ in reorder_buffer:
+            in_flight.append(reorder_buffer.in_flight)
+
+        self.assertLessEqual(max(in_flight), 2)
+
+    def test_unordered_error(self):
+        reorder_buffer = parallel.ReorderBuffer(self.pool, fail, [1], window=1, ordered=False)
+
+        with self.assertRaises(ValueError):
+            list(reorder_buffer)
+
+
+class TestParallelFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def create_file(self, name, contents):
+        filename = os.path.join(self.directory, name)
+        with open(filename, "w") as fd:
+            fd.write(textwrap.dedent(contents))
+        return filename
+
+    def test_analyze_file_skip_invalid(self):
+        filename = self.create_file("invalid.py", "class (")
+
+        with self.assertRaises(SyntaxError):
+            parallel.analyze_file(filename)
+
+        self.assertIsInstance(parallel.analyze_file(filename, skip_invalid=True), SyntaxError)
+
+    def test_analyze_files_in_order(self):
+        filenames = [
+            self.create_file("file{}.py".format(index), """
+            class Cls{}(object):
+                def func(self):
+                    self.variable = 'foo'
+            """.format(index))
+            for index in range(5)
+        ]
+        filenames.append(self.create_file("skipped.py", """
+        # cohesion: skip-file
+        """))
+
+        results = list(parallel.analyze_files(filenames, 2, chunk_size=2))
+
+        self.assertEqual([filename for filename, _ in results], filenames)
+        self.assertEqual(
+            [file_module.classes() for _, file_module in results[:-1]],
+            [["Cls{}".format(index)] for index in range(5)]
+        )
+        self.assertIsInstance(results[-1][1], module.ModuleSkipped)
+
+
+if __name__ == "__main__":
+    unittest.main()
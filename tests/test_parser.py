@@ -69,6 +69,146 @@ class TestParser(unittest.TestCase):
 
         self.assertCountEqual(result, expected)
 
+    def test_get_module_classes_with_qualified_names_nested(self):
+        python_string = textwrap.dedent("""
+        class Outer(object):
+            class Inner(object):
+                pass
+            def method(self):
+                class Local(object):
+                    pass
+        def func():
+            class Local(object):
+                pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        result = [
+            qualified_name
+            for qualified_name, _ in parser.get_module_classes_with_qualified_names(node)
+        ]
+        expected = [
+            "Outer",
+            "Outer.Inner",
+            "Outer.method.<locals>.Local",
+            "func.<locals>.Local",
+        ]
+
+        self.assertEqual(result, expected)
+
+    def test_get_module_classes_compound_statements(self):
+        python_string = textwrap.dedent("""
+        try:
+            class InTry(object): pass
+        except ImportError:
+            class InHandler(object):
+                pass
+        if True: x = 1
+        with context() as value:
+            class InWith(object):
+                pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        result = [cls.name for cls in parser.get_module_classes(node)]
+        expected = ["InTry", "InHandler", "InWith"]
+
+        self.assertEqual(result, expected)
+
+    def test_get_module_classes_without_positions(self):
+        node = ast.Module(
+            body=[ast.If(
+                test=ast.Constant(value=True),
+                body=[ast.ClassDef(name="Cls", bases=[], keywords=[], body=[ast.Pass()], decorator_list=[])],
+                orelse=[],
+            )],
+            type_ignores=[],
+        )
+
+        result = [cls.name for cls in parser.get_module_classes(node)]
+        expected = ["Cls"]
+
+        self.assertEqual(result, expected)
+
+    @unittest.skipUnless(hasattr(ast, "match_case"), "requires Python 3.10")
+    def test_get_module_classes_match_statement(self):
+        python_string = textwrap.dedent("""
+        match value:
+            case 1:
+                class InCase(object):
+                    pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        result = [cls.name for cls in parser.get_module_classes(node)]
+        expected = ["InCase"]
+
+        self.assertEqual(result, expected)
+
+    def test_may_define_class(self):
+        sources = [
+            "class Cls(object):\n    pass\n",
+            "def func():\n\tclass Local: pass\n",
+            b"\xef\xbb\xbfclass Cls: pass\n",
+            "import os\nclassification = 1\n",
+            b"x = 'class'\n",
+        ]
+
+        result = [parser.may_define_class(source) for source in sources]
+        expected = [True, True, True, False, False]
+
+        self.assertEqual(result, expected)
+
+    def test_get_object_name_unknown_node(self):
+        python_string = textwrap.dedent("""
+        (lambda: None)()
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        result = parser.get_object_name(node.body[0].value)
+
+        self.assertIsNone(result)
+
+    def test_get_method_decorator_flags(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            @abc.abstractmethod
+            @classmethod
+            @other_decorator("argument")
+            def func(cls):
+                pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = parser.get_method_decorator_flags(methods[0])
+        expected = frozenset([parser.ABSTRACT_FLAG, parser.CLASSMETHOD_FLAG])
+
+        self.assertEqual(result, expected)
+
+    def test_get_method_decorator_flags_combined_decorator(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            @abc.abstractstaticmethod
+            def func():
+                pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = parser.get_method_decorator_flags(methods[0])
+        expected = frozenset([parser.ABSTRACT_FLAG, parser.STATICMETHOD_FLAG])
+
+        self.assertEqual(result, expected)
+
     def test_get_class_methods_empty(self):
         python_string = textwrap.dedent("""
         class Cls(object):
@@ -164,6 +304,26 @@ class TestParser(unittest.TestCase):
 
         self.assertCountEqual(result, expected)
 
+    def test_get_class_methods_async(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            async def func1(self, arg1):
+                pass
+            def func2(self, arg1):
+                pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = [method.name for method in methods]
+        expected = ["func1", "func2"]
+
+        self.assertCountEqual(result, expected)
+
     def test_bound_method_is_bound(self):
         python_string = textwrap.dedent("""
         class Cls(object):
@@ -453,6 +613,110 @@ class TestParser(unittest.TestCase):
 
         self.assertCountEqual(result, expected)
 
+    def test_get_instance_variables_classmethod_cls(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            @classmethod
+            def func(cls):
+                cls.attr = 5
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        instance_variables = parser.get_instance_variables(node)
+        result = [instance_variable.attr for instance_variable in instance_variables]
+        expected = ["attr"]
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_instance_variables_custom_first_parameter(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(this):
+                this.attr1 = 5
+                self.attr2 = 6
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        instance_variables = parser.get_instance_variables(node)
+        result = [instance_variable.attr for instance_variable in instance_variables]
+        expected = ["attr1"]
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_instance_variables_staticmethod_not_bound(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            @staticmethod
+            def func(self):
+                self.attr = 5
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        instance_variables = parser.get_instance_variables(node)
+
+        self.assertEmpty(instance_variables)
+
+    def test_get_instance_variables_alias(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                s = self
+                s.attr1 = 5
+                if (t := s):
+                    t.attr2 = 6
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        instance_variables = parser.get_instance_variables(node)
+        result = [instance_variable.attr for instance_variable in instance_variables]
+        expected = ["attr1", "attr2"]
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_instance_variables_alias_before_assignment(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                s.attr1 = 5
+                s = self
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        instance_variables = parser.get_instance_variables(node)
+
+        self.assertEmpty(instance_variables)
+
+    def test_get_instance_variables_explicit_bound_name(self):
+        python_string = textwrap.dedent("""
+        def func(obj):
+            obj.attr = 5
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        instance_variables = parser.get_instance_variables(node, bound_name_classifier="obj")
+        result = [instance_variable.attr for instance_variable in instance_variables]
+        expected = ["attr"]
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_method_bound_name_positional_only(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self, /, arg1):
+                pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = [parser.get_method_bound_name(method) for method in methods]
+        expected = ["self"]
+
+        self.assertEqual(result, expected)
+
     def test_get_instance_variables_from_class_avoid_class_variable(self):
         python_string = textwrap.dedent("""
         class Cls(object):
@@ -519,6 +783,109 @@ class TestParser(unittest.TestCase):
 
         self.assertEmpty(result)
 
+    def test_get_class_variable_names_annotated(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            attr1: int
+            attr2: str = 'foo'
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = parser.get_class_variable_names(cls)
+        expected = ['attr1', 'attr2']
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_class_variable_names_tuple_unpacking(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            attr1, (attr2, *attr3) = 1, (2, 3)
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = parser.get_class_variable_names(cls)
+        expected = ['attr1', 'attr2', 'attr3']
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_class_variable_names_slots(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            __slots__ = ('attr1', 'attr2')
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = parser.get_class_variable_names(cls)
+        expected = ['attr1', 'attr2']
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_class_variable_names_slots_single_string(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            __slots__ = 'attr'
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = parser.get_class_variable_names(cls)
+        expected = ['attr']
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_class_variable_names_properties(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            @property
+            def attr1(self):
+                return self._attr1
+            @attr1.setter
+            def attr1(self, value):
+                self._attr1 = value
+            @functools.cached_property
+            def attr2(self):
+                return 5
+            def func(self):
+                pass
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = parser.get_class_variable_names(cls)
+        expected = ['attr1', 'attr2']
+
+        self.assertCountEqual(result, expected)
+
+    def test_register_class_variable_discoverer(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            declare('attr')
+        """)
+
+        def discover_declarations(node, decorator_flags):
+            if isinstance(node.value, ast.Call) and parser.get_object_name(node.value) == 'declare':
+                return [
+                    name
+                    for arg in node.value.args
+                    for name in parser.get_string_constants(arg)
+                ]
+            return []
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+
+        parser.register_class_variable_discoverer(ast.Expr, discover_declarations)
+        try:
+            result = parser.get_class_variable_names(cls)
+        finally:
+            parser.unregister_class_variable_discoverer(ast.Expr, discover_declarations)
+        expected = ['attr']
+
+        self.assertCountEqual(result, expected)
+
     def test_get_all_class_variable_names_both_types(self):
         python_string = textwrap.dedent("""
         class Cls(object):
@@ -645,6 +1012,50 @@ class TestParser(unittest.TestCase):
 
         self.assertCountEqual(result, expected)
 
+    def test_ensure_unrelated_call_name_does_not_hide_instance_variable(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self, other):
+                self.items = other.items()
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        class_methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = [
+            name
+            for method in class_methods
+            for name in parser.get_all_class_variable_names_used_in_method(method)
+        ]
+        expected = ['items']
+
+        self.assertCountEqual(result, expected)
+
+    def test_ensure_call_result_attribute_considered_instance_variable(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                return self.factory().value, self.callback
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        class_methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = [
+            name
+            for method in class_methods
+            for name in parser.get_all_class_variable_names_used_in_method(method)
+        ]
+        expected = ['callback']
+
+        self.assertCountEqual(result, expected)
+
     def test_ensure_decorator_not_considered_instance_variable(self):
         python_string = textwrap.dedent("""
         class Cls(object):
@@ -693,6 +1104,120 @@ class TestParser(unittest.TestCase):
 
         self.assertCountEqual(result, expected)
 
+    def test_get_all_class_variable_names_used_in_method_nested_include(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.attr1 = 5
+                def inner():
+                    return self.attr2
+                return lambda: self.attr3
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        class_methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = [
+            name
+            for method in class_methods
+            for name in parser.get_all_class_variable_names_used_in_method(
+                method,
+                parser.NESTED_SCOPES_INCLUDE
+            )
+        ]
+        expected = ['attr1', 'attr2', 'attr3']
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_all_class_variable_names_used_in_method_nested_exclude(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.attr1 = 5
+                def inner():
+                    return self.attr2
+                return lambda: self.attr3
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        class_methods = [
+            method
+            for cls in parser.get_module_classes(node)
+            for method in parser.get_class_methods(cls)
+        ]
+        result = [
+            name
+            for method in class_methods
+            for name in parser.get_all_class_variable_names_used_in_method(
+                method,
+                parser.NESTED_SCOPES_EXCLUDE
+            )
+        ]
+        expected = ['attr1']
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_all_class_variable_names_nested_exclude(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            attr1 = 5
+            async def func(self):
+                self.attr2 = 6
+                class Inner(object):
+                    def inner(self):
+                        self.attr3 = 7
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = parser.get_all_class_variable_names(cls, parser.NESTED_SCOPES_EXCLUDE)
+        expected = ['attr1', 'attr2']
+
+        self.assertCountEqual(result, expected)
+
+    def test_get_all_class_variables_matches_names(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            __slots__ = ('attr1',)
+            attr2 = 5
+            def func(self):
+                self.attr3 = 6
+            @property
+            def attr4(self):
+                return self.attr1
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = {
+            parser.get_object_name(variable)
+            for variable in parser.get_all_class_variables(cls)
+        }
+        expected = parser.get_all_class_variable_names(cls)
+
+        self.assertEqual(result, expected)
+        self.assertEqual(result, {'attr1', 'attr2', 'attr3', 'attr4'})
+
+    def test_get_all_class_variable_names_avoid_nested_class(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.attr1 = 5
+            class Meta(object):
+                def inner(self):
+                    self.attr2 = 6
+        """)
+
+        node = parser.get_ast_node_from_string(python_string)
+        cls = parser.get_module_classes(node)[0]
+        result = parser.get_all_class_variable_names(cls)
+        expected = ['attr1']
+
+        self.assertCountEqual(result, expected)
+
     def test_get_all_class_variable_names_missing_function_name(self):
         python_string = textwrap.dedent("""
         class C():
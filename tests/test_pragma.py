@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+
+import textwrap
+import unittest
+
+from cohesion import pragma
+
+
+class TestPragma(unittest.TestCase):
+
+    def test_parse_pragmas_ignore(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):  # cohesion: ignore
+            pass
+
+        class Other(object):  #cohesion:ignore
+            pass
+        """)
+
+        result = pragma.parse_pragmas(python_string)
+        expected = (False, {2, 5})
+
+        self.assertEqual(result, expected)
+
+    def test_parse_pragmas_skip_file(self):
+        python_string = textwrap.dedent("""
+        # cohesion: skip-file
+        class Cls(object):  # cohesion: ignore
+            pass
+        """)
+
+        result = pragma.parse_pragmas(python_string)
+        expected = (True, set())
+
+        self.assertEqual(result, expected)
+
+    def test_parse_pragmas_bytes(self):
+        python_bytes = b"class Cls(object):\n    pass\nclass Other(object):  # cohesion: ignore\n    pass\n"
+
+        result = pragma.parse_pragmas(python_bytes)
+        expected = (False, {3})
+
+        self.assertEqual(result, expected)
+
+    def test_parse_pragmas_other_comment(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):  # cohesion: ignored-by-nobody
+            pass
+        """)
+
+        result = pragma.parse_pragmas(python_string)
+        expected = (False, set())
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
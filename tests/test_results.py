@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+
+import io
+import os
+import textwrap
+import unittest
+
+from cohesion import module
+from cohesion import results
+
+
+class TestResults(unittest.TestCase):
+
+    def test_parse_shard(self):
+        result = results.parse_shard("2/4")
+        expected = (2, 4)
+
+        self.assertEqual(result, expected)
+
+    def test_parse_shard_invalid_format(self):
+        with self.assertRaises(ValueError):
+            results.parse_shard("2")
+
+    def test_parse_shard_invalid_index(self):
+        with self.assertRaises(ValueError):
+            results.parse_shard("0/4")
+
+    def test_get_shard_index_normalizes_path(self):
+        result = results.get_shard_index(os.path.join(".", "directory", "filename.py"), 7)
+        expected = results.get_shard_index(os.path.join("directory", "filename.py"), 7)
+
+        self.assertEqual(result, expected)
+
+    def test_filter_shard_partitions_files(self):
+        filenames = ["file{}.py".format(i) for i in range(20)]
+
+        result = sorted(
+            filename
+            for shard_index in range(1, 4)
+            for filename in results.filter_shard(filenames, shard_index, 3)
+        )
+        expected = sorted(filenames)
+
+        self.assertEqual(result, expected)
+
+    def test_record_round_trip(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            class_variable = 'foo'
+            def func(self):
+                self.instance_variable = 'bar'
+        """)
+
+        python_module = module.Module.from_string(python_string)
+        fd = io.StringIO(results.dump_record("file.py", python_module.structure) + "\n")
+
+        result = list(results.iter_records(fd))
+        expected = [("file.py", python_module.structure)]
+
+        self.assertEqual(result, expected)
+
+    def test_merge_records_sorted(self):
+        shard1 = [("a.py", {}), ("c.py", {})]
+        shard2 = [("b.py", {}), ("d.py", {})]
+
+        result = [filename for filename, _ in results.merge_records([shard1, shard2])]
+        expected = ["a.py", "b.py", "c.py", "d.py"]
+
+        self.assertEqual(result, expected)
+
+    def test_merge_records_unsorted(self):
+        shard1 = [("a.py", {}), ("c.py", {})]
+        shard2 = [("d.py", {}), ("b.py", {})]
+
+        with self.assertRaises(ValueError):
+            list(results.merge_records([shard1, shard2]))
+
+    def test_summary(self):
+        summary = results.Summary()
+        summary.add("a.py", {"Cls1": {"cohesion": 50.0}, "Cls2": {"cohesion": 100.0}})
+        summary.add("b.py", {"Cls3": {"cohesion": 0.0}})
+
+        result = (summary.file_count, summary.class_count, summary.average_cohesion())
+        expected = (2, 3, 50.0)
+
+        self.assertEqual(result, expected)
+
+    def test_top_classes_by_cohesion(self):
+        python_string1 = textwrap.dedent("""
+        class Cls1(object):
+            variable1 = 'foo'
+            def func(self):
+                self.variable2 = 'bar'
+        class Cls2(object):
+            variable1 = 'foo'
+            variable2 = 'bar'
+            def func(self):
+                self.variable3 = 'baz'
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls3(object):
+            def func(self):
+                self.variable = 'foo'
+        class Cls4(object):
+            variable = 'foo'
+            def func(self):
+                pass
+        """)
+
+        top_classes = results.TopClasses(2)
+        top_classes.add("a.py", module.Module.from_string(python_string1).structure)
+        top_classes.add("b.py", module.Module.from_string(python_string2).structure)
+
+        result = [(filename, class_name) for filename, class_name, _ in top_classes.items()]
+        expected = [("b.py", "Cls4"), ("a.py", "Cls2")]
+
+        self.assertEqual(result, expected)
+
+    def test_top_classes_bounded(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            variable = 'foo'
+            def func(self):
+                pass
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls(object):
+            def func(self):
+                self.variable = 'foo'
+        """)
+        low_structure = module.Module.from_string(python_string1).structure
+        high_structure = module.Module.from_string(python_string2).structure
+
+        top_classes = results.TopClasses(3)
+        for index in range(100):
+            top_classes.add(
+                "file{}.py".format(index),
+                low_structure if index % 10 == 0 else high_structure
+            )
+
+        self.assertEqual(len(top_classes.heap), 3)
+        self.assertEqual(
+            [filename for filename, _, _ in top_classes.items()],
+            ["file0.py", "file10.py", "file20.py"]
+        )
+
+    def test_top_classes_by_methods(self):
+        python_string = textwrap.dedent("""
+        class Cls1(object):
+            variable = 'foo'
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                self.variable = 'bar'
+            def func3(self):
+                pass
+        class Cls2(object):
+            variable = 'foo'
+            def func(self):
+                pass
+        class Cls3(object):
+            variable = 'foo'
+            def func1(self):
+                self.variable = 'foo'
+            def func2(self):
+                pass
+            def func3(self):
+                pass
+        """)
+
+        top_classes = results.TopClasses(2, results.SORT_METHODS)
+        top_classes.add("a.py", module.Module.from_string(python_string).structure)
+
+        result = [class_name for _, class_name, _ in top_classes.items()]
+        expected = ["Cls3", "Cls1"]
+
+        self.assertEqual(result, expected)
+
+    def test_top_classes_by_attributes(self):
+        python_string = textwrap.dedent("""
+        class Cls1(object):
+            variable = 'foo'
+        class Cls2(object):
+            def func(self):
+                self.variable1 = 'foo'
+                self.variable2 = 'bar'
+                self.variable3 = 'baz'
+                self.variable4 = 'qux'
+        """)
+
+        top_classes = results.TopClasses(1, results.SORT_ATTRIBUTES)
+        top_classes.add("a.py", module.Module.from_string(python_string).structure)
+
+        result = [class_name for _, class_name, _ in top_classes.items()]
+        expected = ["Cls2"]
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+import random
+import textwrap
+import unittest
+
+from cohesion import module
+from cohesion import scoring
+
+
+def make_class_source(class_name, function_variable_counts, variable_count):
+    """
+    Return the source of a class with variable_count class variables whose
+    i-th method uses the first function_variable_counts[i] of them
+    """
+    lines = ["class {}(object):".format(class_name), "    pass"]
+
+    if variable_count:
+        lines.append("    {} = None".format(" = ".join(
+            "variable{}".format(j) for j in range(variable_count)
+        )))
+
+    for i, count in enumerate(function_variable_counts):
+        lines.append("    def func{}(self):".format(i))
+        lines.append("        return ({})".format("".join(
+            "self.variable{}, ".format(j) for j in range(count)
+        )))
+
+    return "\n".join(lines) + "\n"
+
+
+def make_random_classes(count, seed=0):
+    generator = random.Random(seed)
+    class_sources = []
+
+    for i in range(count):
+        variable_count = generator.randint(0, 40)
+        function_variable_counts = [
+            generator.randint(0, variable_count)
+            for _ in range(generator.randint(0, 10))
+        ]
+        class_sources.append(make_class_source("Cls{}".format(i), function_variable_counts, variable_count))
+
+    return list(module.Module.from_string("".join(class_sources)).structure.values())
+
+
+class TestScoring(unittest.TestCase):
+
+    def test_class_cohesion_percentage(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            class_variable = 'foo'
+            def func(self):
+                self.instance_variable = 'bar'
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = scoring.class_cohesion_percentage(python_module.structure["Cls"])
+        expected = 50
+
+        self.assertEqual(result, expected)
+
+    def test_class_cohesion_percentage_empty(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            variable1 = 'foo'
+            variable2 = 'bar'
+            variable3 = 'baz'
+        """)
+
+        python_module = module.Module.from_string(python_string)
+
+        result = scoring.class_cohesion_percentage(python_module.structure["Cls"])
+        expected = 0.0
+
+        self.assertEqual(result, expected)
+
+    def test_class_cohesion_percentages_python_backend(self):
+        python_string = textwrap.dedent("""
+        class Cls1(object):
+            variable1 = 'foo'
+            def func1(self):
+                self.variable2 = 'bar'
+            def func2(self):
+                self.variable2 = 'bar'
+                self.variable3 = 'baz'
+        class Cls2(object):
+            pass
+        """)
+
+        class_structures = list(module.Module.from_string(python_string).structure.values())
+
+        result = scoring.class_cohesion_percentages(class_structures, scoring.BACKEND_PYTHON)
+        expected = [50.0, 0.0]
+
+        self.assertEqual(result, expected)
+
+
+@unittest.skipIf(scoring.numpy is None, "NumPy is not installed")
+class TestScoringNumpy(unittest.TestCase):
+
+    def test_numpy_backend_identical(self):
+        class_structures = make_random_classes(500)
+
+        result = scoring.class_cohesion_percentages(class_structures, scoring.BACKEND_NUMPY)
+        expected = scoring.class_cohesion_percentages(class_structures, scoring.BACKEND_PYTHON)
+
+        self.assertEqual(
+            [value.hex() for value in result],
+            [value.hex() for value in expected]
+        )
+
+    def test_numpy_backend_rounding_ties(self):
+        # 1/800 and 3/800 produce percentages exactly halfway between two
+        # hundredths, which must be rounded to even like Python's round()
+        python_string = "".join([
+            make_class_source("Cls1", [1], 800),
+            make_class_source("Cls2", [3], 800),
+            make_class_source("Cls3", [1, 0, 0], 3),
+            make_class_source("Cls4", [], 4),
+            make_class_source("Cls5", [0, 0], 0),
+        ])
+
+        class_structures = list(module.Module.from_string(python_string).structure.values())
+
+        result = scoring.class_cohesion_percentages(class_structures, scoring.BACKEND_NUMPY)
+        expected = scoring.class_cohesion_percentages(class_structures, scoring.BACKEND_PYTHON)
+
+        self.assertEqual(
+            [value.hex() for value in result],
+            [value.hex() for value in expected]
+        )
+
+    def test_numpy_backend_empty(self):
+        result = scoring.class_cohesion_percentages([], scoring.BACKEND_NUMPY)
+
+        self.assertEqual(result, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+
+import io
+import os
+import shutil
+import tempfile
+import textwrap
+import unittest
+
+from cohesion import module
+from cohesion import store
+
+
+def make_store_bytes(records):
+    writer = store.StoreWriter()
+    for filename, module_structure in records:
+        writer.add(filename, module_structure)
+
+    fd = io.BytesIO()
+    writer.write(fd)
+    return fd.getvalue()
+
+
+class TestStore(unittest.TestCase):
+
+    def setUp(self):
+        python_string1 = textwrap.dedent("""
+        class Cls(object):
+            variable = 'foo'
+            def func1(self):
+                self.variable = 'bar'
+            @classmethod
+            def func2(cls):
+                pass
+        """)
+        python_string2 = textwrap.dedent("""
+        class Cls(object):
+            pass
+        class Other(object):
+            def func(self):
+                self.other = 1
+        """)
+
+        self.records = [
+            ("b.py", module.Module.from_string(python_string1).structure),
+            ("a.py", module.Module.from_string(python_string2).structure),
+        ]
+
+    def test_iter_records_sorted(self):
+        result_store = store.Store(make_store_bytes(self.records))
+
+        result = list(result_store.iter_records())
+        expected = sorted(self.records)
+
+        self.assertEqual(result, expected)
+
+    def test_find_file(self):
+        result_store = store.Store(make_store_bytes(self.records))
+
+        self.assertEqual(result_store.find_file("b.py"), self.records[0][1])
+        self.assertIsNone(result_store.find_file("c.py"))
+        self.assertIsNone(result_store.find_file("Cls"))
+
+    def test_find_file_normalized(self):
+        result_store = store.Store(make_store_bytes([
+            (os.path.join(".", "directory", "b.py"), self.records[0][1]),
+        ]))
+
+        self.assertEqual(result_store.find_file("directory/b.py"), self.records[0][1])
+        self.assertEqual(result_store.find_file(os.path.join(".", "directory", "b.py")), self.records[0][1])
+        self.assertEqual([filename for filename, _ in result_store.iter_records()], ["directory/b.py"])
+
+    def test_find_class(self):
+        result_store = store.Store(make_store_bytes(self.records))
+
+        result = [filename for filename, _ in result_store.find_class("Cls")]
+        expected = ["a.py", "b.py"]
+
+        self.assertEqual(result, expected)
+        self.assertEqual(list(result_store.find_class("Missing")), [])
+
+    def test_cohesion_round_trip(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            a, b, c = 1, 2, 3
+            def func(self):
+                self.a = 1
+        """)
+
+        structure = module.Module.from_string(python_string).structure
+
+        result_store = store.Store(make_store_bytes([("file.py", structure)]))
+
+        result = result_store.find_file("file.py")["Cls"]["cohesion"]
+        expected = structure["Cls"]["cohesion"]
+
+        self.assertEqual(result, expected)
+
+    def test_invalid_magic(self):
+        with self.assertRaises(ValueError):
+            store.Store(b"{}" * store.HEADER.size)
+
+    def test_truncated(self):
+        with self.assertRaises(ValueError):
+            store.Store(make_store_bytes(self.records)[:-1])
+
+
+class TestStoreFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_from_file(self):
+        python_string = textwrap.dedent("""
+        class Cls(object):
+            pass
+        """)
+
+        structure = module.Module.from_string(python_string).structure
+        filename = os.path.join(self.directory, "results.bin")
+
+        writer = store.StoreWriter()
+        writer.add("file.py", structure)
+        writer.to_file(filename)
+
+        self.assertTrue(store.is_store_file(filename))
+        with store.Store.from_file(filename) as result_store:
+            result = list(result_store.iter_records())
+        expected = [("file.py", structure)]
+
+        self.assertEqual(result, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from cohesion import watch
+
+
+class FakeWatcher(object):
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+
+    def read_changes(self, timeout=None):
+        return self.batches.pop(0)
+
+
+class TestIterChanges(unittest.TestCase):
+
+    def test_iter_changes_debounce(self):
+        watcher = FakeWatcher([
+            set(), {"a.py"}, {"b.py"}, set(),
+            {"c.py"}, set(),
+        ])
+
+        changes = watch.iter_changes(watcher, debounce=0)
+        result = [next(changes), next(changes)]
+        expected = [{"a.py", "b.py"}, {"c.py"}]
+
+        self.assertEqual(result, expected)
+
+
+class TestWatchers(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = self.create_file("module.py")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def create_file(self, name, contents=""):
+        filename = os.path.join(self.directory, name)
+        with open(filename, "w") as fd:
+            fd.write(contents)
+        return filename
+
+    def test_polling_watcher(self):
+        watcher = watch.PollingWatcher(self.directory, interval=0)
+
+        self.assertEqual(watcher.read_changes(0), set())
+
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        created = self.create_file("created.py")
+        self.create_file("notes.txt")
+
+        self.assertEqual(watcher.read_changes(0), {self.filename, created})
+
+        os.remove(created)
+
+        self.assertEqual(watcher.read_changes(0), {created})
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "requires Linux")
+    def test_inotify_watcher(self):
+        watcher = watch.InotifyWatcher(self.directory)
+
+        try:
+            self.create_file("module.py", "x = 1")
+            os.mkdir(os.path.join(self.directory, "package"))
+            self.create_file("notes.txt")
+
+            result = watcher.read_changes(1)
+            expected = {self.filename}
+
+            self.assertEqual(result, expected)
+
+            nested = self.create_file(os.path.join("package", "nested.py"))
+
+            self.assertEqual(watcher.read_changes(1), {nested})
+        finally:
+            watcher.close()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "requires Linux")
+    def test_get_watcher_falls_back_to_polling(self):
+        add_directory = mock.patch.object(
+            watch.InotifyWatcher,
+            "add_directory",
+            side_effect=OSError(28, "No space left on device")
+        )
+
+        with add_directory, self.assertLogs(watch.logger, "WARNING"):
+            watcher = watch.get_watcher(self.directory)
+
+        self.assertIsInstance(watcher, watch.PollingWatcher)
+
+
+if __name__ == "__main__":
+    unittest.main()